@@ -1,10 +1,12 @@
+import argparse
+import logging
 import os
 import sys
 import time
 import pandas as pd
 from PyQt5.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, QFileDialog, QLineEdit,
-    QTableWidget, QTableWidgetItem, QProgressBar, QMessageBox, QHeaderView, QSpacerItem, QSizePolicy, QFrame
+    QTableView, QProgressBar, QMessageBox, QHeaderView, QSpacerItem, QSizePolicy, QFrame
 )
 from PyQt5 import QtWidgets, QtCore
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
@@ -12,12 +14,15 @@ from PyQt5.QtGui import QIcon, QColor, QPainter, QBrush, QLinearGradient, QPixma
 import ctypes  
 
 from multiprocessing import Process, Event, Queue
-import scrapy 
-from scrapy.crawler import CrawlerProcess
-from scrapy.utils.project import get_project_settings
-from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
-from scrapy import signals
-from pydispatch import dispatcher
+from phoneScrapper.inputs import FILE_DIALOG_FILTER, count_domains
+from phoneScrapper.profiles import PROFILES
+from phoneScrapper.progress import SKIPPED, STARTED, CompletionRate, split_batch
+from phoneScrapper.runner import run_spider
+from phoneScrapper.transport import receive_batches
+from results_model import EXPORT_COLUMNS, ResultStore, ResultsTableModel
+from ui_refresh import RefreshScheduler
+
+logger = logging.getLogger(__name__)
 
 if getattr(sys, 'frozen', False):
     base_path = sys._MEIPASS
@@ -28,7 +33,7 @@ else:
 # Paths for images
 base_path = os.path.join(base_path, 'images')
 
-print(base_path)
+logger.debug(f"Images path: {base_path}")
 
 # Setting up the relative file paths
 browser_icon_path = os.path.join(base_path, 'browser_icon.png')
@@ -42,63 +47,34 @@ icon_path = os.path.join(base_path, 'scrapper.png')
 # Set the AppUserModelID to ensure the taskbar icon appears
 ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID('company.app.1')
 
-def run_spider(domains, item_queue, spider_closed_event, pause_event):
-    settings = get_project_settings()
-    process = CrawlerProcess(settings=settings)
-
-    class CustomPhoneScrapperSpider(PhoneScrapperSpider):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, **kwargs)
-            dispatcher.connect(self.item_scraped_callback, signal=signals.item_scraped)
-            dispatcher.connect(self.spider_closed_callback, signal=signals.spider_closed)
-            self.pause_event = pause_event
-
-        def item_scraped_callback(self, item, response, spider):
-            item_queue.put(dict(item))  # Put scraped items into the queue
-
-        def spider_closed_callback(self, spider):
-            spider_closed_event.set()  # Set the event to indicate the spider has closed
-
-        def start_requests(self):
-            urls = [self.convert_to_url(domain) for domain in self.domains]
-            self.logger.info(f"Starting requests for {len(urls)} URLs")
-            for url in urls:
-                self.logger.info(f"Requesting URL: {url}")
-                while self.pause_event.is_set():  # Check pause event
-                    self.logger.info(f"Pausing URL request: {url}")
-                    time.sleep(1)
-                yield scrapy.Request(url=url, callback=self.parse, errback=self.errback_handle, meta={'parent_url': url, 'is_parent': True})
-
-    process.crawl(CustomPhoneScrapperSpider, domains=domains)
-    process.start()
-    process.stop()
-
 class ScrapingThread(QThread):
-    item_scraped = pyqtSignal(dict)
+    items_scraped = pyqtSignal(list)  # One batch of scraped items
+    domain_events = pyqtSignal(list)  # progress.DomainEvents of the same batch
     spider_closed = pyqtSignal()
-    url_processed = pyqtSignal(int, int)  # Emit total contacts found and not found for each URL
 
-    def __init__(self, domains, pause_event):
+    def __init__(self, domains, pause_event, input_path=None, profile=None):
         super().__init__()
         self.domains = domains
+        self.input_path = input_path
+        self.profile = profile
         self.pause_event = pause_event
         self.item_queue = Queue()
         self.spider_closed_event = Event()
         self.process = None
 
     def run(self):
-        self.process = Process(target=run_spider, args=(self.domains, self.item_queue, self.spider_closed_event, self.pause_event))
+        self.process = Process(target=run_spider, args=(self.domains, self.item_queue, self.spider_closed_event, self.pause_event, self.input_path, self.profile))
         self.process.start()
         self.monitor_queue()
 
     def monitor_queue(self):
-        while self.process.is_alive() or not self.item_queue.empty():
-            if not self.item_queue.empty():
-                item = self.item_queue.get()
-                self.item_scraped.emit(item)
-                total_found = sum(1 for key in ['phone_number_1', 'phone_number_2', 'phone_number_3'] if item.get(key))
-                total_not_found = 3 - total_found
-                self.url_processed.emit(total_found, total_not_found)
+        # Blocks on the queue until the crawler process sends a batch or exits
+        for batch in receive_batches(self.item_queue, self.process.is_alive):
+            items, events = split_batch(batch)
+            if items:
+                self.items_scraped.emit(items)
+            if events:
+                self.domain_events.emit(events)
         self.spider_closed.emit()
 
     def stop(self):
@@ -106,6 +82,20 @@ class ScrapingThread(QThread):
             self.process.terminate()
         self.process.join()
 
+class DomainCountThread(QThread):
+    counted = pyqtSignal(str, int)
+    failed = pyqtSignal(str, str)
+
+    def __init__(self, file_path):
+        super().__init__()
+        self.file_path = file_path
+
+    def run(self):
+        try:
+            self.counted.emit(self.file_path, count_domains(self.file_path))
+        except Exception as e:
+            self.failed.emit(self.file_path, str(e))
+
 class GradientWidget(QWidget):
     def __init__(self):
         super().__init__()
@@ -160,7 +150,7 @@ class IconAfterTextButton(QPushButton):
             # """)
 
 class ScrapingApp(QMainWindow):
-    def __init__(self):
+    def __init__(self, profile=None):
         super().__init__()
         self.setWindowTitle("Phone Number Scraper")
         self.setGeometry(100, 100, 1200, 800)
@@ -168,7 +158,12 @@ class ScrapingApp(QMainWindow):
         self.setWindowIcon(QIcon(icon_path))
 
         self.file_path = ""
-        self.scraped_data = []
+        self.profile = profile  # Settings profile, None for settings.py as is
+        self.total_domains = 0
+        self.count_threads = []
+        self.results = ResultsTableModel(self)
+        self.ui_refresh = RefreshScheduler()
+        self.completion_rate = CompletionRate()
         self.pause_event = Event()
         self.scraping_thread = None
         self.start_time = None
@@ -186,11 +181,12 @@ class ScrapingApp(QMainWindow):
         # Table layout on the left side
         table_layout = QVBoxLayout()
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(8)
-        self.table.setHorizontalHeaderLabels(["Sl.", "🌐 Website", "Phone Number 1️⃣", "🗺️ Country", "Phone Number 2️⃣", "🗺️ Country", "Phone Number 3️⃣", "🗺️ Country"])
+        # Only the visible cells of the model are ever built
+        self.table = QTableView()
+        self.table.setModel(self.results)
+        self.table.setAlternatingRowColors(True)
 
-        # Set custom stylesheet for header
+        # Set custom stylesheet for header and alternating rows
         self.table.setStyleSheet("""
             QHeaderView::section {
                 background-color: #E6E6FA;
@@ -199,10 +195,16 @@ class ScrapingApp(QMainWindow):
                 border: 1px solid lightgray;
                 font-family: "Core Sans DS 45 Medium";
             }
+            QTableView {
+                background-color: #ffffff;
+                alternate-background-color: #f0f0f0;
+            }
         """)
 
         # Hide the vertical header to remove the default row numbers
         self.table.verticalHeader().setVisible(False)
+        # Same height for every row, so scrolling doesn't measure rows
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
 
         # Allow manual resizing of columns
         header = self.table.horizontalHeader()
@@ -725,44 +727,57 @@ class ScrapingApp(QMainWindow):
 
         self.setCentralWidget(main_widget)
 
-        # Timer to update elapsed time and remaining time
+        # Timer of the refresh: redraws the counts, table and times a few times a second
         self.timer = QTimer()
-        self.timer.timeout.connect(self.update_time)
-        self.timer.start(1000)
+        self.timer.timeout.connect(self.refresh)
+        self.timer.start(self.ui_refresh.interval)
 
     def browse_file(self):
-        file_path, _ = QFileDialog.getOpenFileName(self, "Select Excel file", "", "Excel files (*.xlsx)")
+        file_path, _ = QFileDialog.getOpenFileName(self, "Select domain list", "", FILE_DIALOG_FILTER)
         if file_path:
             self.file_path = file_path
-            self.domain_count_label.setText(f"Total domains Uploaded <br>{len(pd.read_excel(file_path, header=None)[0])}")
+            self.total_domains = 0
+            self.domain_count_label.setText("Total domains Uploaded <br>Counting...")
             # self.file_path_label.setText(file_path)
+            # Counted off the GUI thread; the list itself is only read by the crawler process
+            count_thread = DomainCountThread(file_path)
+            count_thread.counted.connect(self.domains_counted)
+            count_thread.failed.connect(self.domains_count_failed)
+            count_thread.finished.connect(lambda: self.count_threads.remove(count_thread))
+            self.count_threads.append(count_thread)
+            count_thread.start()
+
+    def domains_counted(self, file_path, count):
+        if file_path == self.file_path:
+            self.total_domains = count
+            self.domain_count_label.setText(f"Total domains Uploaded <br>{count}")
+
+    def domains_count_failed(self, file_path, error):
+        if file_path == self.file_path:
+            self.file_path = ""
+            self.domain_count_label.setText("Total domains Uploaded <br>0")
+            QMessageBox.critical(self, "Error", f"Failed to read domain list: {error}")
 
     def start_scraping(self):
-        print("start scraping")
+        logger.info("Start scraping")
         if not self.file_path:
-            QMessageBox.warning(self, "Warning", "Please select an Excel file first.")
+            QMessageBox.warning(self, "Warning", "Please select a domain list file first.")
             return
         if self.scraping_thread and self.scraping_thread.isRunning():
             QMessageBox.warning(self, "Warning", "Scraping is already running.")
             return
-        try:
-            self.domains = pd.read_excel(self.file_path, header=None)[0].tolist()
-            self.domain_count_label.setText(f"Total domains Uploaded <br>{len(self.domains)}")
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to read Excel file: {e}")
-            return
-
-        self.scraped_data.clear()
+        self.results.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
+        self.ui_refresh.reset()
+        self.completion_rate = CompletionRate()
 
-        self.scraping_thread = ScrapingThread(self.domains, self.pause_event)
-        self.scraping_thread.item_scraped.connect(self.item_scraped)
+        self.scraping_thread = ScrapingThread(None, self.pause_event, input_path=self.file_path, profile=self.profile)
+        self.scraping_thread.items_scraped.connect(self.items_scraped)
+        self.scraping_thread.domain_events.connect(self.domain_events)
         self.scraping_thread.spider_closed.connect(self.spider_closed)
-        self.scraping_thread.url_processed.connect(self.update_counts)  
         self.start_time = time.time() 
         self.scraping_thread.start()
         self.start_button.setEnabled(False)
@@ -773,25 +788,30 @@ class ScrapingApp(QMainWindow):
             QMessageBox.warning(self, "Warning", "Please enter a single domain.")
             return
 
-        self.scraped_data.clear()
+        self.results.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
+        self.ui_refresh.reset()
+        self.completion_rate = CompletionRate()
 
-        self.domains = [single_url]  # Set the single domain
-        self.scraping_thread = ScrapingThread(self.domains, self.pause_event)
-        self.scraping_thread.item_scraped.connect(self.item_scraped)
+        self.total_domains = 1
+        self.scraping_thread = ScrapingThread([single_url], self.pause_event, profile=self.profile or 'single-lookup')  # Set the single domain
+        self.scraping_thread.items_scraped.connect(self.items_scraped)
+        self.scraping_thread.domain_events.connect(self.domain_events)
         self.scraping_thread.spider_closed.connect(self.spider_closed)
-        self.scraping_thread.url_processed.connect(self.update_counts) 
         self.start_time = time.time() 
         self.scraping_thread.start()
         self.single_start_button.setEnabled(False)
 
-    def item_scraped(self, item):
-        print("item scrapped")
-        print("item scrapped")
+    def items_scraped(self, items):
+        # One row per domain, updated in place as its numbers come in; shown
+        # by the next refresh(). The counts and progress come from the domain events
+        self.results.apply_records(items, self.result_values)
+        self.ui_refresh.mark('table')
+
+    def result_values(self, item):
         def format_phone_number(number):
             if not number:
                 return ""
@@ -819,7 +839,6 @@ class ScrapingApp(QMainWindow):
 
             return f"{country_code} {formatted_number}".strip()
 
-        print(f"Item scraped: {item}")
         # Check if phone_number_1 and country_1 are not from 'US' or 'CA'
         if item.get('country_1', '') not in ["US", "CA"] and not item.get('phone_number_3', ''):
             item['phone_number_3'] = item.get('phone_number_1', '')
@@ -849,10 +868,8 @@ class ScrapingApp(QMainWindow):
                 other_numbers.append((number, country))
 
         row_data = [
-            str(len(self.scraped_data) + 1),  # Serial number
             item.get('url', ''),
         ]
-        print(row_data) ##############################
 
         # Append US and CA numbers first, then others
         for number, country in us_ca_numbers:
@@ -863,55 +880,77 @@ class ScrapingApp(QMainWindow):
             row_data.append(country)
 
         # Fill remaining cells with empty strings if there are less than 3 numbers
-        while len(row_data) < 8:
+        while len(row_data) < ResultStore.COLUMNS:
             row_data.append('')
 
-        row = self.table.rowCount()
-        self.table.insertRow(row)
-        for i, data in enumerate(row_data):
-            cell_item = QTableWidgetItem(data)
-            if row % 2 == 0:  # Even row
-                cell_item.setBackground(QColor("#f0f0f0"))
-            else:  # Odd row
-                cell_item.setBackground(QColor("#ffffff"))
-            self.table.setItem(row, i, cell_item)
-
-        self.scraped_data.append(row_data)
-
-
-    def update_counts(self, total_found, total_not_found):
-        self.total_urls_processed += 1
+        return row_data
+
+
+    def domain_events(self, events):
+        total_found = 0
+        total_not_found = 0
+        completed = 0
+        for event in events:
+            if event.kind == STARTED:
+                continue
+            # Finished, failed or skipped: done either way
+            completed += 1
+            if event.kind != SKIPPED:
+                # Up to three numbers are shown per domain
+                found = min(event.numbers, 3)
+                total_found += found
+                total_not_found += 3 - found
+        self.update_counts(total_found, total_not_found, completed)
+
+    def update_counts(self, total_found, total_not_found, urls_processed=1):
+        # Shown by the next refresh()
+        self.total_urls_processed += urls_processed
         self.total_contact_found += total_found
         self.total_contact_not_found += total_not_found
-        success_rate = (self.total_contact_found / (self.total_contact_found + self.total_contact_not_found)) * 100
+        self.ui_refresh.mark('counts')
+
+    def show_counts(self):
+        total_contacts = self.total_contact_found + self.total_contact_not_found
+        success_rate = (self.total_contact_found / total_contacts) * 100 if total_contacts else 0
 
         self.total_urls_processed_label.setText(f"Total URLs Processed: {self.total_urls_processed}")
         self.total_contact_found_label.setText(f"Contact Numbers Found: {self.total_contact_found}")
         self.total_contact_not_found_label.setText(f"Contact Numbers Not Found: {self.total_contact_not_found}")
         self.success_rate_label.setText(f"Contact Success Rate: {success_rate:.2f}%")
-        
+
         self.update_progress_bar()
 
     def update_progress_bar(self):
-        progress = (self.total_urls_processed / len(self.domains)) * 100 if self.domains else 0
-        self.progress_bar.setValue(progress)
-        QApplication.processEvents()  
+        progress = (self.total_urls_processed / self.total_domains) * 100 if self.total_domains else 0
+        self.progress_bar.setValue(int(progress))
+
+    def refresh(self):
+        # One frame: redraw what changed since the last one
+        with self.ui_refresh.frame() as dirty:
+            if 'table' in dirty:
+                self.results.publish()
+            if 'counts' in dirty:
+                self.show_counts()
+            self.update_time()
 
     def spider_closed(self):
+        # Show the last batches now rather than at the next frame
+        self.refresh()
         elapsed_time = time.time() - self.start_time
+        self.start_time = None
         self.time_label.setText(f"Elapsed Time: {elapsed_time:.2f}s")
         self.remaining_label.setText("Time remaining: 0s")
         self.progress_bar.setValue(100)
-        self.timer.stop()
         self.start_button.setEnabled(True)
         self.single_start_button.setEnabled(True) 
+        logger.info(f"UI refresh: {self.ui_refresh.format_summary()}")
 
     def clear_results(self):
         self.file_path = ""
+        self.total_domains = 0
         self.browse_button.setStyleSheet("")
         self.progress_bar.setValue(0)
-        self.table.setRowCount(0)
-        self.scraped_data.clear()
+        self.results.clear()
         self.total_urls_processed = 0
         self.total_contact_found = 0
         self.total_contact_not_found = 0
@@ -968,7 +1007,7 @@ class ScrapingApp(QMainWindow):
         self.pause_event.clear()
 
     def save_results(self, filetype):
-        if not self.scraped_data:
+        if not self.results.rowCount():
             QMessageBox.warning(self, "Warning", "No data to save.")
             return
 
@@ -983,7 +1022,7 @@ class ScrapingApp(QMainWindow):
 
     def _save_as_csv(self, file_path):
         try:
-            df = pd.DataFrame(self.scraped_data, columns=["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"])
+            df = pd.DataFrame(list(self.results.store.rows()), columns=EXPORT_COLUMNS)
             df.to_csv(file_path, index=False)
             QMessageBox.information(self, "Info", "Data saved successfully as CSV.")
         except Exception as e:
@@ -991,7 +1030,7 @@ class ScrapingApp(QMainWindow):
 
     def _save_as_excel(self, file_path):
         try:
-            df = pd.DataFrame(self.scraped_data, columns=["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"])
+            df = pd.DataFrame(list(self.results.store.rows()), columns=EXPORT_COLUMNS)
             df.to_excel(file_path, index=False)
             QMessageBox.information(self, "Info", "Data saved successfully as Excel.")
         except Exception as e:
@@ -1017,22 +1056,27 @@ class ScrapingApp(QMainWindow):
             elapsed_time = time.time() - self.start_time
             self.time_label.setText(f"Elapsed Time: {elapsed_time:.2f}s")
 
-            # Calculate progress based on total URLs processed
-            progress = self.total_urls_processed / len(self.domains) if self.domains else 0
+            # From the recent rate of completed domains rather than the average since the start
+            self.completion_rate.update(self.total_urls_processed, time.monotonic())
+            remaining_time = self.completion_rate.eta(self.total_domains - self.total_urls_processed) if self.total_domains else None
 
-            if progress > 0:
-                total_time = elapsed_time / progress
-                remaining_time = total_time - elapsed_time
+            if remaining_time is not None:
                 self.remaining_label.setText(f"Time remaining: {remaining_time:.2f}s")
-                print(f"Time remaining: {remaining_time:.2f}s")
             else:
                 self.remaining_label.setText("Time remaining: Calculating...")
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', choices=list(PROFILES), help='settings profile of the crawls')
+    # Anything else is for Qt
+    args, qt_args = parser.parse_known_args()
+    # The window's own log lines; the crawls log on their own (see phoneScrapper/runner.py)
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+    app = QApplication(sys.argv[:1] + qt_args)
     # app.setWindowIcon(QIcon('phoneScrapper/scrapper1.ico')) 
     app.setWindowIcon(QIcon(icon_path)) 
-    window = ScrapingApp()
+    window = ScrapingApp(profile=args.profile)
     window.show()
     sys.exit(app.exec_())
@@ -0,0 +1,94 @@
+"""
+Measure extract_phone_numbers throughput (pages/sec) over a saved corpus.
+
+    python benchmarks/bench_extraction.py --corpus path/to/saved/pages
+
+Every *.html / *.htm file under the corpus directory is loaded once and the
+spider's extraction is run over all of them --rounds times. Without --corpus
+a synthetic set of footer-heavy e-commerce pages is generated.
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from scrapy.http import HtmlResponse, Request
+
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+
+
+def synthetic_page(rng, products=120, depth=6):
+    cards = []
+    for i in range(products):
+        cards.append(
+            f'<div class="card"><div class="card-body"><h3>Product {i}</h3>'
+            f'<p>SKU {rng.randint(10000, 99999)} - <span class="price">${rng.randint(5, 500)}.99</span></p>'
+            f'<span class="rating">{rng.randint(1, 5)} stars</span></div></div>'
+        )
+    footer = (
+        '<footer class="site-footer"><section><div class="cols">'
+        + ''.join(f'<div class="col"><ul>' + ''.join(f'<li><a href="/c/{j}">Category {j}</a></li>' for j in range(15)) + '</ul></div>' for _ in range(4))
+        + '<address>123 Main St, Springfield, IL 62701</address>'
+        + '<p>Call us: <a href="tel:+18009592505">(800) 959-2505</a></p>'
+        + '</div></section></footer>'
+    )
+    body = ''.join(cards)
+    for level in range(depth):
+        body = f'<div class="wrap-{level}"><section>{body}</section></div>'
+    return f'<html><head><title>Shop</title></head><body><header><nav>Menu</nav></header>{body}{footer}</body></html>'
+
+
+def load_corpus(path):
+    pages = []
+    for dirpath, _, filenames in os.walk(path):
+        for filename in sorted(filenames):
+            if filename.lower().endswith(('.html', '.htm')):
+                with open(os.path.join(dirpath, filename), 'rb') as f:
+                    pages.append((f'https://{filename}/', f.read()))
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--corpus', help='directory of saved HTML pages')
+    parser.add_argument('--pages', type=int, default=50, help='synthetic pages to generate without --corpus')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    if args.corpus:
+        pages = load_corpus(args.corpus)
+    else:
+        rng = random.Random(0)
+        pages = [(f'https://shop{i}.example/', synthetic_page(rng).encode()) for i in range(args.pages)]
+    if not pages:
+        sys.exit('No pages found')
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, 'Country_zip.csv')
+        with open(csv_path, 'w') as f:
+            f.write('Zip,Country\n62701,US\n')
+        spider = PhoneScrapperSpider(domains=[], excel_file_path=csv_path)
+
+        elapsed = 0.0
+        found = 0
+        for _ in range(args.rounds):
+            for url, body in pages:
+                # Fresh responses every round so per-response caches start cold
+                response = HtmlResponse(url=url, body=body, encoding='utf-8', request=Request(url))
+                start = time.perf_counter()
+                found += len(spider.extract_phone_numbers(response))
+                elapsed += time.perf_counter() - start
+
+    total = len(pages) * args.rounds
+    size = sum(len(body) for _, body in pages) / len(pages)
+    print(f'{total} pages (avg {size / 1024:.0f} KiB), {found} numbers, '
+          f'{elapsed:.2f}s, {total / elapsed:.1f} pages/sec')
+
+
+if __name__ == '__main__':
+    main()
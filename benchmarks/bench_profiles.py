@@ -0,0 +1,131 @@
+"""
+Measure crawl throughput (pages/sec) of the settings profiles against local sites.
+
+    python benchmarks/bench_profiles.py [--profile broad] [--domains 50]
+
+A threaded HTTP server answers for every 127.0.0.x host, each one a small
+site of an index page linking to a contact and an about page, all with a
+phone number, after --latency seconds. Each profile crawls all the hosts in
+its own process (a Twisted reactor can't be restarted) with
+phoneScrapper.runner.crawl; only the CSV feed, the HTTP cache and the domain
+row map are turned off.
+"""
+
+import argparse
+import http.server
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from phoneScrapper.profiles import PROFILES
+
+
+PAGES = {
+    '/': ('<html><body><h1>Welcome</h1><p>Call us at (212) 555-{n:04d}</p>'
+          '<a href="/contact">Contact us</a> <a href="/about">About us</a></body></html>'),
+    '/contact': '<html><body><p>Sales: (646) 555-{n:04d}</p></body></html>',
+    '/about': '<html><body><p>Head office: (718) 555-{n:04d}</p></body></html>',
+}
+
+
+def host_for(i):
+    # 127.0.0.1 is left alone; all of 127/8 is loopback
+    return f'127.0.{(i + 2) // 256}.{(i + 2) % 256}'
+
+
+class SiteHandler(http.server.BaseHTTPRequestHandler):
+    latency = 0.05
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        page = PAGES.get(self.path)
+        if page is None:
+            self.send_error(404)
+            return
+        # A different number on every host
+        n = sum(int(part) for part in self.headers.get('Host', '0').split(':')[0].split('.') if part.isdigit()) % 10000
+        body = page.format(n=n).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def crawl(profile, domains_file):
+    """Crawl the hosts listed in domains_file with a profile, print stats as JSON."""
+    from phoneScrapper import runner
+    from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+
+    class LocalSpider(PhoneScrapperSpider):
+        def convert_to_url(self, domain):
+            return f'http://{domain}/'
+
+    stats = runner.crawl(
+        input_path=domains_file,
+        profile=profile,
+        overrides={'FEEDS': {}, 'HTTPCACHE_ENABLED': False, 'DOMAIN_ROW_MAP': None},
+        spider_cls=LocalSpider,
+    )
+    elapsed = (stats['finish_time'] - stats['start_time']).total_seconds()
+    pages = stats.get('response_received_count', 0)
+    print(json.dumps({
+        'profile': profile,
+        'pages': pages,
+        'results': stats.get('results/final', 0),
+        'elapsed': round(elapsed, 2),
+        'pages_per_sec': round(pages / elapsed, 1),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--profile', choices=list(PROFILES), action='append', help='profile to run (default: all)')
+    parser.add_argument('--domains', type=int, default=50)
+    parser.add_argument('--latency', type=float, default=0.05, help='server response time in seconds')
+    parser.add_argument('--verbose', action='store_true', help='show the crawl logs')
+    parser.add_argument('--crawl', nargs=2, metavar=('PROFILE', 'DOMAINS_FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.crawl:
+        crawl(*args.crawl)
+        return
+
+    SiteHandler.latency = args.latency
+    server = http.server.ThreadingHTTPServer(('', 0), SiteHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        domains_file = os.path.join(tmp_dir, 'domains.txt')
+        with open(domains_file, 'w') as f:
+            f.writelines(f'{host_for(i)}:{server.server_port}\n' for i in range(args.domains))
+        for profile in args.profile or list(PROFILES):
+            result = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--crawl', profile, domains_file],
+                cwd=tmp_dir,
+                env=dict(os.environ, PYTHONPATH=os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))),
+                stdout=subprocess.PIPE,
+                stderr=None if args.verbose else subprocess.DEVNULL,
+                text=True,
+            )
+            if result.returncode:
+                print(f'{profile}: crawl failed with exit code {result.returncode}')
+                continue
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{profile:14} {stats['pages']} pages, {stats['results']} results, "
+                  f"{stats['elapsed']:.2f}s, {stats['pages_per_sec']:.1f} pages/sec")
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""
+Measure the crawler -> GUI item transport: idle CPU use and sustained items/sec.
+
+    python benchmarks/bench_transport.py [--items 200000] [--idle 2]
+
+A producer process stands in for the crawler: it sleeps --idle seconds (a
+crawl waiting on the network), then sends --items items as fast as it can.
+The receiving side is either the old ScrapingThread loop (spinning on
+item_queue.empty(), one queue message per item) or transport.py (batches,
+blocking reads with a timeout). Reported: CPU used by the receiving process
+while no item is coming, and items/sec from the first item to the last.
+"""
+
+import argparse
+import os
+import sys
+import time
+from multiprocessing import Process, Queue
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from phoneScrapper.transport import END, BatchSender, receive_batches
+
+
+def make_item(i):
+    return {
+        'url': f'https://shop{i}.example', 'phone_number_1': f'212555{i % 10000:04d}', 'country_1': 'US',
+        'phone_number_2': f'646555{i % 10000:04d}', 'country_2': 'US',
+    }
+
+
+def produce(queue, items, idle, batched, batch_size, interval):
+    time.sleep(idle)
+    if batched:
+        sender = BatchSender(queue.put, batch_size, interval)
+        for i in range(items):
+            sender.add(make_item(i))
+        sender.close()
+        queue.put(END)
+    else:
+        for i in range(items):
+            queue.put(make_item(i))
+
+
+def receive_spinning(queue, process, on_items):
+    # ScrapingThread.monitor_queue before batching
+    while process.is_alive() or not queue.empty():
+        if not queue.empty():
+            on_items([queue.get()])
+
+
+def receive_batched(queue, process, on_items):
+    for batch in receive_batches(queue, process.is_alive):
+        on_items(batch)
+
+
+def run(receive, batched, args):
+    queue = Queue()
+    process = Process(target=produce, args=(queue, args.items, args.idle, batched, args.batch_size, args.interval))
+    received = 0
+    first = None
+    cpu_start = time.process_time()
+    wall_start = time.monotonic()
+
+    def on_items(items):
+        nonlocal received, first
+        if first is None:
+            first = (time.monotonic(), time.process_time())
+        received += len(items)
+
+    process.start()
+    receive(queue, process, on_items)
+    last = time.monotonic()
+    process.join()
+
+    idle_wall = first[0] - wall_start
+    idle_cpu = first[1] - cpu_start
+    return received, idle_cpu / idle_wall * 100, received / (last - first[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--items', type=int, default=200000)
+    parser.add_argument('--idle', type=float, default=2.0, help='seconds before the first item')
+    parser.add_argument('--batch-size', type=int, default=200)
+    parser.add_argument('--interval', type=float, default=0.1)
+    args = parser.parse_args()
+
+    for name, receive, batched in (('spinning', receive_spinning, False), ('batched', receive_batched, True)):
+        received, idle_cpu, rate = run(receive, batched, args)
+        print(f'{name:9} {received} items, idle CPU {idle_cpu:.1f}%, {rate:,.0f} items/sec')
+
+
+if __name__ == '__main__':
+    main()
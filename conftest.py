@@ -0,0 +1 @@
+# Makes the repository root importable (phoneScrapper, results_model, ...) when running pytest
@@ -0,0 +1,6 @@
+import sys
+
+from phoneScrapper.cli import main
+
+
+sys.exit(main())
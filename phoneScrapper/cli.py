@@ -0,0 +1,143 @@
+# Headless command line entry point, for batch jobs on machines without a desktop.
+#
+#   python -m phoneScrapper DOMAIN_LIST [-o results.jsonl] [--profile broad] [--concurrency 64] [--shards 0]
+#
+# One result per domain is written when the domain is done, with the
+# project's feed exporters: JSON lines on stdout by default, or to --output
+# in --format (jsonlines, json or csv, guessed from the file name). With
+# --deltas, the numbers found along the way are written too, as 'delta'
+# records before the domain's 'final' one (see results.py). With --shards,
+# the list is split over several crawler processes (see
+# runner.crawl_sharded) and their results are written as one stream. What
+# happened to every input row is written next to an --output file, as
+# NAME.rows.csv (see DOMAIN_ROW_MAP). Logs go to stderr; a summary of the
+# crawl is printed there at the end, and the exit status is 0 only if the
+# crawl finished normally.
+
+import argparse
+import json
+import os
+import sys
+
+from scrapy.utils.misc import load_object
+
+from phoneScrapper.profiles import PROFILES
+from phoneScrapper.results import is_final
+
+
+FORMATS = {'.jsonl': 'jsonlines', '.jl': 'jsonlines', '.json': 'json', '.csv': 'csv'}
+
+
+def _setting(value):
+    name, sep, setting = value.partition('=')
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {value!r}")
+    return name, setting
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m phoneScrapper', description='Scrape phone numbers of a list of domains.')
+    parser.add_argument('input', nargs='?', help='domain list file (.xlsx, .csv, .txt, optionally gzipped)')
+    parser.add_argument('-d', '--domain', action='append', default=[], help='domain to crawl, can be repeated')
+    parser.add_argument('-o', '--output', default='-', help='output file, - for stdout (default)')
+    parser.add_argument('-f', '--format', choices=sorted(set(FORMATS.values())),
+                        help='output format (default: from the output file name, else jsonlines)')
+    parser.add_argument('--profile', choices=list(PROFILES), help='settings profile (default: settings.py as is)')
+    parser.add_argument('--concurrency', type=int, help='CONCURRENT_REQUESTS, overriding the profile')
+    parser.add_argument('--shards', type=int, help='crawler processes, 0 for one per CPU core (default: CRAWL_SHARDS)')
+    parser.add_argument('-s', '--set', type=_setting, action='append', default=[], metavar='NAME=VALUE',
+                        help='override a Scrapy setting, can be repeated')
+    parser.add_argument('--deltas', action='store_true', help='also write the numbers found while a domain is crawled')
+    parser.add_argument('--stats', metavar='FILE', help='write all the crawl stats to FILE as JSON')
+    args = parser.parse_args(argv)
+    if not args.input and not args.domain:
+        parser.error('give a domain list file and/or --domain')
+    return args
+
+
+def row_map_path(output):
+    """The DOMAIN_ROW_MAP file for an output file: results.jsonl -> results.rows.csv."""
+    if output == '-':
+        return None
+    return os.path.splitext(output)[0] + '.rows.csv'
+
+
+def output_format(output, format=None):
+    if format is None:
+        suffix = '.' + output.rsplit('.', 1)[-1].lower() if '.' in output else ''
+        format = FORMATS.get(suffix, 'jsonlines')
+    return format
+
+
+class ItemWriter:
+    """
+    Writes items to output (- for stdout) with the FEED_EXPORTERS exporter
+    of format; delta records only if deltas is true.
+    """
+
+    def __init__(self, settings, output, format, deltas=False):
+        self.deltas = deltas
+        self.file = sys.stdout.buffer if output == '-' else open(output, 'wb')
+        exporter_cls = load_object(settings.getwithbase('FEED_EXPORTERS')[format])
+        self.exporter = exporter_cls(self.file, encoding='utf8')
+        self.exporter.start_exporting()
+
+    def write(self, item):
+        if not self.deltas and not is_final(item):
+            return
+        self.exporter.export_item(item)
+        # Keep the stream moving for whatever reads it
+        self.file.flush()
+
+    def close(self):
+        self.exporter.finish_exporting()
+        if self.file is sys.stdout.buffer:
+            self.file.flush()
+        else:
+            self.file.close()
+
+
+def summary(stats):
+    elapsed = stats.get('elapsed_time_seconds', 0)
+    pages = stats.get('response_received_count', 0)
+    rate = pages / elapsed if elapsed else 0
+    return (f"{stats.get('domain_prepass/unique', 0)} domains "
+            f"({stats.get('domain_prepass/rows', 0)} input rows) in {elapsed:.1f}s: "
+            f"{stats.get('domains/finished', 0)} finished, {stats.get('domains/failed', 0)} failed, "
+            f"{pages} pages ({rate:.1f} pages/sec), {stats.get('results/final', 0)} results, "
+            f"{stats.get('log_count/ERROR', 0)} errors, finish reason: {stats.get('finish_reason')}")
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported late so --help doesn't load the spider
+    from phoneScrapper.runner import crawl, crawl_sharded, project_settings
+
+    # Items are written here rather than by the project's FEEDS
+    overrides = dict(args.set, FEEDS={})
+    if row_map_path(args.output) and 'DOMAIN_ROW_MAP' not in overrides:
+        overrides['DOMAIN_ROW_MAP'] = row_map_path(args.output)
+    if args.concurrency:
+        overrides['CONCURRENT_REQUESTS'] = args.concurrency
+    settings = project_settings(args.profile, overrides)
+    shards = settings.getint('CRAWL_SHARDS', 1) if args.shards is None else args.shards
+
+    writer = ItemWriter(settings, args.output, output_format(args.output, args.format), args.deltas)
+    try:
+        if shards == 1:
+            stats = crawl(args.domain, args.input, profile=args.profile, overrides=overrides, item_callback=writer.write)
+        else:
+            stats = crawl_sharded(args.domain, args.input, shards=shards or None, profile=args.profile,
+                                  overrides=overrides, item_callback=writer.write)
+    finally:
+        writer.close()
+
+    print(summary(stats), file=sys.stderr)
+    if args.stats:
+        with open(args.stats, 'w', encoding='utf-8') as f:
+            json.dump(stats, f, indent=2, sort_keys=True, default=str)
+    return 0 if stats.get('finish_reason') == 'finished' else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,61 @@
+# Memoized phone number -> country lookup.
+#
+# The same footer number shows up on every subpage of a domain and across
+# franchise domains, and phonenumbers parsing is expensive. CountryResolver
+# wraps a spider's uncached lookup in a bounded LRU keyed on the normalized
+# number and reports hits/misses to the Scrapy stats collector.
+
+import re
+from collections import OrderedDict
+
+
+NON_DIGIT_RE = re.compile(r'\D')
+LETTER_RE = re.compile(r'[a-zA-Z]')
+
+
+class CountryResolver:
+
+    def __init__(self, lookup, maxsize=50000, stats=None):
+        self.lookup = lookup
+        self.maxsize = maxsize
+        self.stats = stats
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+    @staticmethod
+    def cache_key(phone_number):
+        """
+        Digits of the number, prefixed with '+' when it is written in
+        international form (phonenumbers only parses those without a region).
+        Text with letters is parsed differently by phonenumbers and isn't cached.
+        """
+        if not phone_number or LETTER_RE.search(phone_number):
+            return None
+        digits = NON_DIGIT_RE.sub('', phone_number)
+        if phone_number.lstrip().startswith('+'):
+            return '+' + digits
+        return digits
+
+    def resolve(self, phone_number):
+        key = self.cache_key(phone_number)
+        if key is not None and key in self._cache:
+            self._cache.move_to_end(key)
+            self._count('hit')
+            return self._cache[key]
+
+        self._count('miss')
+        country = self.lookup(phone_number)
+        if key is not None:
+            self._cache[key] = country
+            if len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return country
+
+    def _count(self, outcome):
+        if outcome == 'hit':
+            self.hits += 1
+        else:
+            self.misses += 1
+        if self.stats is not None:
+            self.stats.inc_value(f'country_resolver/{outcome}')
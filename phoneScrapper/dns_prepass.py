@@ -0,0 +1,318 @@
+# Optional bulk DNS pre-resolution of the input domains.
+#
+# A dead domain used to cost a full request, RETRY_TIMES retries and a DNS
+# timeout before errback_handle saw the DNSLookupError. With
+# DNS_PREPASS_ENABLED, all canonical input hosts are resolved concurrently
+# before the crawl starts, on a separate asyncio loop:
+#   - answers are stored in a persistent SQLite cache (DNS_CACHE_FILE);
+#     non-existent hosts (NXDOMAIN for the host and for its www. variant,
+#     which the fallback chain would try) are kept for DNS_NEGATIVE_TTL,
+#     live hosts for DNS_POSITIVE_TTL; no-data answers and failed lookups
+#     are not stored
+#   - during the crawl, DomainPrepass rejects hosts cached as non-existent
+#     and the cached IPv4 address of every other host is put in Scrapy's
+#     DNS cache right before its request is created
+#
+# Resolution is pluggable (DNS_PREPASS_RESOLVER) so tests can use
+# StaticResolver instead of real DNS:
+#
+#   python -m phoneScrapper.dns_prepass DOMAIN_LIST
+
+import asyncio
+import ipaddress
+import logging
+import socket
+import sqlite3
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from scrapy.resolver import dnscache
+from scrapy.utils.misc import load_object
+
+from phoneScrapper.domains import DomainDeduper, normalize_domain
+from phoneScrapper.inputs import iter_input_rows
+
+
+logger = logging.getLogger(__name__)
+
+# getaddrinfo errors meaning the host has no address, as opposed to a failed lookup
+NOT_FOUND_ERRORS = {
+    getattr(socket, name): reason
+    for name, reason in (('EAI_NONAME', 'nxdomain'), ('EAI_NODATA', 'nodata'))
+    if hasattr(socket, name)
+}
+
+# The only outcome cached and rejected: no-data answers can be transient, or
+# mean the site lives on another name
+DEAD = 'nxdomain'
+
+
+class HostNotFound(Exception):
+    """
+    The host does not exist or has no address; reason is 'nxdomain' or
+    'nodata'. Only 'nxdomain' makes a host dead.
+    """
+
+    def __init__(self, host, reason='nxdomain'):
+        super().__init__(f"{host}: {reason}")
+        self.reason = reason
+
+
+class SystemResolver:
+    """Resolves with the system resolver (getaddrinfo) in a thread pool."""
+
+    def __init__(self, concurrency=100):
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='dns-prepass')
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.getint('DNS_PREPASS_CONCURRENCY', 100))
+
+    async def resolve(self, host):
+        """The host's first IPv4 address, None if it only has IPv6 ones."""
+        loop = asyncio.get_running_loop()
+        try:
+            infos = await loop.run_in_executor(
+                self.executor, socket.getaddrinfo, host, None, socket.AF_UNSPEC, socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            if e.errno in NOT_FOUND_ERRORS:
+                raise HostNotFound(host, NOT_FOUND_ERRORS[e.errno]) from e
+            raise
+        # Scrapy's DNS cache only takes IPv4 addresses
+        return next((info[4][0] for info in infos if info[0] == socket.AF_INET), None)
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+class StaticResolver:
+    """
+    Resolver stub answering from a host -> address dict: None for a host
+    that does not exist, '' for one without an IPv4 address.
+    """
+
+    def __init__(self, hosts):
+        self.hosts = dict(hosts)
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(settings.getdict('DNS_STATIC_HOSTS'))
+
+    async def resolve(self, host):
+        if self.hosts.get(host) is None:
+            raise HostNotFound(host)
+        return self.hosts[host] or None
+
+    def close(self):
+        pass
+
+
+class DnsCache:
+    """
+    Persistent host -> address / non-existence cache with per-entry expiry.
+    A live host without an IPv4 address is stored with address None.
+    """
+
+    def __init__(self, path, positive_ttl=3600, negative_ttl=86400, seed_scrapy_cache=True):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.seed_scrapy_cache = seed_scrapy_cache
+        self.counts = Counter()
+        self._db = sqlite3.connect(path)
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS dns_cache '
+            '(host TEXT PRIMARY KEY, address TEXT, error TEXT, expires REAL) WITHOUT ROWID'
+        )
+        self._db.execute('DELETE FROM dns_cache WHERE expires < ?', (time.time(),))
+        self._db.commit()
+
+    @classmethod
+    def from_settings(cls, settings):
+        # Addresses can only be handed to the default, IPv4 threaded resolver's cache
+        resolver = settings.get('DNS_RESOLVER', '')
+        return cls(
+            settings.get('DNS_CACHE_FILE', 'dns_cache.sqlite'),
+            positive_ttl=settings.getfloat('DNS_POSITIVE_TTL', 3600),
+            negative_ttl=settings.getfloat('DNS_NEGATIVE_TTL', 86400),
+            seed_scrapy_cache=settings.getbool('DNSCACHE_ENABLED', True) and resolver.endswith('CachingThreadedResolver'),
+        )
+
+    def get(self, host):
+        """(address, error) for a fresh entry, None if host isn't cached."""
+        row = self._db.execute(
+            'SELECT address, error FROM dns_cache WHERE host = ? AND expires >= ?', (host, time.time())
+        ).fetchone()
+        return row
+
+    def put(self, host, address=None, error=None):
+        ttl = self.negative_ttl if error else self.positive_ttl
+        self._db.execute(
+            'INSERT OR REPLACE INTO dns_cache (host, address, error, expires) VALUES (?, ?, ?, ?)',
+            (host, address, error, time.time() + ttl),
+        )
+
+    def commit(self):
+        self._db.commit()
+
+    def check(self, domain):
+        """
+        Host filter for DomainPrepass: the reason a domain is known dead, or
+        None after handing its cached address (if any) to Scrapy's DNS cache.
+        """
+        host = domain.rsplit(':', 1)[0] if domain.count(':') == 1 else domain
+        entry = self.get(host)
+        if entry is None:
+            self.counts['unknown'] += 1
+            return None
+        address, error = entry
+        if error == DEAD:
+            self.counts['dead'] += 1
+            return error
+        if address and self.seed_scrapy_cache and dnscache.limit:
+            dnscache[host] = address
+            self.counts['seeded'] += 1
+        return None
+
+    def record_stats(self, stats, prefix='dns_cache'):
+        for key, count in self.counts.items():
+            stats.set_value(f'{prefix}/{key}', count)
+
+    def close(self):
+        self._db.commit()
+        self._db.close()
+
+
+async def _www_alive(host, resolver, timeout):
+    # The host the fallback chain tries after a DNS error, see fallback.py
+    if host.startswith('www.'):
+        return False
+    try:
+        await asyncio.wait_for(resolver.resolve(f'www.{host}'), timeout)
+    except HostNotFound as e:
+        return e.reason != DEAD
+    except (asyncio.TimeoutError, OSError):
+        return True
+    return True
+
+
+async def _resolve_hosts(hosts, cache, resolver, concurrency, timeout, counts):
+    hosts = iter(hosts)
+
+    async def worker():
+        # Hosts are pulled one at a time, so huge lists never become huge task lists
+        for host in hosts:
+            try:
+                address = await asyncio.wait_for(resolver.resolve(host), timeout)
+            except HostNotFound as e:
+                if e.reason == DEAD and await _www_alive(host, resolver, timeout):
+                    # Only www.<host> exists: live, but the request for host itself will fail over to it
+                    cache.put(host)
+                    counts['www_only'] += 1
+                else:
+                    if e.reason == DEAD:
+                        cache.put(host, error=e.reason)
+                    counts[e.reason] += 1
+            except (asyncio.TimeoutError, OSError) as e:
+                counts['failed'] += 1
+                logger.debug(f"DNS pre-resolution of {host} failed: {e!r}")
+            else:
+                cache.put(host, address=address)
+                counts['resolved'] += 1
+            if sum(counts.values()) % 1000 == 0:
+                cache.commit()
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    cache.commit()
+
+
+def pre_resolve(hosts, cache, resolver, concurrency=100, timeout=5.0):
+    """
+    Resolve hosts (an iterable of host names) with at most concurrency lookups
+    in flight, storing the answers in cache. Hosts with a fresh cache entry are
+    skipped. Runs on its own event loop, so call it before the crawl starts.
+    """
+    counts = Counter()
+
+    def uncached():
+        for host in hosts:
+            if cache.get(host) is None:
+                yield host
+            else:
+                counts['cached'] += 1
+
+    loop = asyncio.new_event_loop()
+    try:
+        loop.run_until_complete(_resolve_hosts(uncached(), cache, resolver, concurrency, timeout, counts))
+    finally:
+        loop.close()
+    return counts
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+def iter_hosts(rows, max_memory=1000000):
+    """Distinct canonical host names of (row number, entry) pairs."""
+    deduper = DomainDeduper(max_memory)
+    try:
+        for _, entry in rows:
+            domain, _ = normalize_domain(entry)
+            if domain is None:
+                continue
+            host = domain.rsplit(':', 1)[0] if domain.count(':') == 1 else domain
+            if not _is_ip_address(host) and deduper.add(host):
+                yield host
+    finally:
+        deduper.close()
+
+
+def pre_resolve_input(settings, domains=None, input_path=None):
+    """
+    Run the DNS pre-resolution stage for the spider input (domains list and/or
+    domain list file) if DNS_PREPASS_ENABLED. Returns the outcome counts.
+    """
+    if not settings.getbool('DNS_PREPASS_ENABLED'):
+        return Counter()
+
+    resolver_cls = load_object(settings.get('DNS_PREPASS_RESOLVER', 'phoneScrapper.dns_prepass.SystemResolver'))
+    resolver = resolver_cls.from_settings(settings)
+    cache = DnsCache.from_settings(settings)
+    started = time.monotonic()
+    try:
+        counts = pre_resolve(
+            iter_hosts(iter_input_rows(domains, input_path), settings.getint('DOMAIN_DEDUPE_MEMORY', 1000000)),
+            cache,
+            resolver,
+            concurrency=settings.getint('DNS_PREPASS_CONCURRENCY', 100),
+            timeout=settings.getfloat('DNS_PREPASS_TIMEOUT', 5.0),
+        )
+    finally:
+        resolver.close()
+        cache.close()
+    logger.info(f"DNS pre-resolution took {time.monotonic() - started:.1f}s: {dict(counts)}")
+    return counts
+
+
+def main(argv=None):
+    from scrapy.utils.project import get_project_settings
+
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        sys.exit("Usage: python -m phoneScrapper.dns_prepass DOMAIN_LIST")
+    logging.basicConfig(level=logging.INFO)
+    settings = get_project_settings()
+    settings.set('DNS_PREPASS_ENABLED', True)
+    counts = pre_resolve_input(settings, input_path=argv[0])
+    print(', '.join(f'{count} {outcome}' for outcome, count in sorted(counts.items())))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,184 @@
+# Domain normalization and dedupe pass run before crawling.
+#
+# Every input row used to become a crawl of https://<row as typed>, so
+# duplicates, www. variants, entries with a scheme or a path and stray
+# whitespace were all crawled separately. DomainPrepass canonicalizes each
+# entry (scheme, path, credentials and whitespace stripped, lowercased, IDNA
+# encoded, leading www. collapsed), lets only the first occurrence of every
+# domain through and records what happened to each row, so results can be
+# mapped back to all the original rows.
+#
+# Seen domains are kept in a set; past max_memory of them they move to a
+# temporary SQLite database so multi-million-row lists stay bounded. An
+# optional host_filter (see dns_prepass.DnsCache.check) can reject domains
+# known to be dead. With a shard (index, count), only the rows of that shard
+# are handled, so several crawler processes can share one list (see
+# runner.crawl_sharded): all rows of a domain go to the same shard.
+# on_skipped(row, entry, status) is called for every handled row that isn't
+# crawled, for progress reporting (see progress.DomainTracker).
+
+import csv
+import os
+import re
+import sqlite3
+import tempfile
+import zlib
+from collections import Counter
+from urllib.parse import urlsplit
+
+
+HOST_RE = re.compile(r'^(?!-)[a-z0-9_-]{1,63}(?<!-)(?:\.(?!-)[a-z0-9_-]{1,63}(?<!-))+$')
+
+ROW_MAP_FIELDS = ['row', 'input', 'domain', 'url', 'status']
+
+
+def normalize_domain(entry):
+    """
+    Canonical domain of an input entry such as ' https://WWW.Example.com/contact '.
+    Returns (domain, None), or (None, reason) for an entry that isn't a domain.
+    """
+    entry = str(entry).strip()
+    if not entry:
+        return None, 'empty'
+    if '://' not in entry:
+        entry = '//' + entry
+    try:
+        parts = urlsplit(entry)
+        host = parts.hostname
+        port = parts.port
+    except ValueError:
+        return None, 'invalid'
+    if parts.scheme and parts.scheme not in ('http', 'https'):
+        return None, 'scheme'
+    if not host:
+        return None, 'invalid'
+    try:
+        host = host.rstrip('.').encode('idna').decode('ascii')
+    except UnicodeError:
+        return None, 'invalid'
+    if host.startswith('www.'):
+        host = host[4:]
+    if not HOST_RE.match(host):
+        return None, 'invalid'
+    return (f'{host}:{port}' if port else host), None
+
+
+def shard_of(row, domain, count):
+    """Shard (0 to count - 1) of an input row, by its canonical domain if it has one."""
+    if domain is None:
+        return (row - 1) % count
+    return zlib.crc32(domain.encode()) % count
+
+
+class DomainDeduper:
+    """Set of seen domains, spilled to a temporary SQLite file when it grows large."""
+
+    def __init__(self, max_memory=1000000):
+        self.max_memory = max_memory
+        self._seen = set()
+        self._db = None
+        self._db_path = None
+
+    def add(self, domain):
+        """Add domain, returning False if it was seen already."""
+        if self._db is None:
+            if domain in self._seen:
+                return False
+            self._seen.add(domain)
+            if len(self._seen) > self.max_memory:
+                self._spill()
+            return True
+        cursor = self._db.execute('INSERT OR IGNORE INTO seen (domain) VALUES (?)', (domain,))
+        return cursor.rowcount == 1
+
+    @property
+    def on_disk(self):
+        return self._db is not None
+
+    def _spill(self):
+        fd, self._db_path = tempfile.mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self._db = sqlite3.connect(self._db_path, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode = OFF')
+        self._db.execute('PRAGMA synchronous = OFF')
+        self._db.execute('CREATE TABLE seen (domain TEXT PRIMARY KEY) WITHOUT ROWID')
+        self._db.executemany('INSERT INTO seen (domain) VALUES (?)', ((domain,) for domain in self._seen))
+        self._seen = set()
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+            os.remove(self._db_path)
+        self._seen = set()
+
+
+class DomainPrepass:
+
+    def __init__(self, url_for, row_map_path=None, max_memory=1000000, host_filter=None, shard=None):
+        """
+        url_for turns a canonical domain into the parent URL that is crawled
+        (and that items are keyed on). If row_map_path is given, one CSV line
+        per input row is written there: row, input, domain, url, status.
+        host_filter(domain) returns a rejection reason for a unique domain, or None.
+        shard is (index, count) to only handle the rows of one shard.
+        """
+        self.url_for = url_for
+        self.row_map_path = row_map_path
+        self.host_filter = host_filter
+        self.shard = shard
+        self.deduper = DomainDeduper(max_memory)
+        self.on_skipped = None
+        self.counts = Counter()
+        self._row_map = None
+        self._writer = None
+
+    def run(self, rows):
+        """Yield the first occurrence of every valid domain among (row number, entry) pairs."""
+        if self.row_map_path and self._writer is None:
+            self._row_map = open(self.row_map_path, 'w', newline='', encoding='utf-8')
+            self._writer = csv.writer(self._row_map)
+            self._writer.writerow(ROW_MAP_FIELDS)
+        for row, entry in rows:
+            domain, reason = normalize_domain(entry)
+            if self.shard is not None and shard_of(row, domain, self.shard[1]) != self.shard[0]:
+                continue
+            self.counts['rows'] += 1
+            status = None
+            if domain is not None:
+                if not self.deduper.add(domain):
+                    status = 'duplicate'
+                    self.counts['duplicate'] += 1
+                elif self.host_filter is not None:
+                    reason = self.host_filter(domain)
+            if reason:
+                status = f'rejected:{reason}'
+                self.counts['rejected'] += 1
+                self.counts[f'rejected/{reason}'] += 1
+            elif status is None:
+                status = 'ok'
+                self.counts['unique'] += 1
+            url = self.url_for(domain) if status in ('ok', 'duplicate') else ''
+            if self._writer is not None:
+                self._writer.writerow([row, entry, domain or '', url, status])
+            if status == 'ok':
+                yield domain
+            elif self.on_skipped is not None:
+                self.on_skipped(row, entry, status)
+
+    def summary(self):
+        counts = self.counts
+        return (f"{counts['rows']} input rows: {counts['unique']} domains to crawl, "
+                f"{counts['duplicate']} duplicates, {counts['rejected']} rejected")
+
+    def record_stats(self, stats, prefix='domain_prepass'):
+        for key, count in self.counts.items():
+            stats.set_value(f'{prefix}/{key}', count)
+        if self.deduper.on_disk:
+            stats.set_value(f'{prefix}/on_disk', True)
+
+    def close(self):
+        if self._row_map is not None:
+            self._row_map.close()
+            self._row_map = self._writer = None
+        self.deduper.close()
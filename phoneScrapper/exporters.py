@@ -11,6 +11,9 @@ class CustomCsvItemExporter(CsvItemExporter):
 
     def export_item(self, item):
         phone_numbers = item.get('phone_numbers', [])
+        if not phone_numbers:
+            # PhoneScrapperItem has phone_number_1..3 fields
+            phone_numbers = [item.get(f'phone_number_{i+1}') for i in range(3) if item.get(f'phone_number_{i+1}')]
         
         # Prepare item for export
         itemdict = dict(self._get_serialized_fields(item, default_value=''))
@@ -0,0 +1,73 @@
+# Scrapy extensions used by the phone scrapper.
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import logging
+import time
+
+from scrapy import signals
+from twisted.internet import task
+
+
+logger = logging.getLogger(__name__)
+
+
+class PauseController:
+    """
+    Pauses and resumes the engine from the spider's pause_event (the
+    multiprocessing Event that ScrapingApp.pause_scraping sets).
+
+    The event is polled with a LoopingCall on the reactor, so pausing never
+    blocks it: requests already downloading finish normally, the engine just
+    stops taking new ones from the scheduler until the event is cleared.
+    """
+
+    def __init__(self, crawler, interval):
+        self.crawler = crawler
+        self.interval = interval
+        self.pause_event = None
+        self.paused_since = None
+        self.loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        ext = cls(crawler, crawler.settings.getfloat('PAUSE_POLL_INTERVAL', 0.25))
+        crawler.signals.connect(ext.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(ext.spider_closed, signal=signals.spider_closed)
+        return ext
+
+    def spider_opened(self, spider):
+        self.pause_event = getattr(spider, 'pause_event', None)
+        if self.pause_event is None:
+            return
+        self.loop = task.LoopingCall(self.poll)
+        self.loop.start(self.interval, now=True)
+
+    def spider_closed(self, spider):
+        if self.loop is not None and self.loop.running:
+            self.loop.stop()
+        if self.paused_since is not None:
+            self._record_pause()
+
+    def poll(self):
+        engine = self.crawler.engine
+        if self.pause_event.is_set():
+            if self.paused_since is None:
+                logger.info("Pausing crawl, requests in progress will finish")
+                engine.pause()
+                self.paused_since = time.monotonic()
+                self.crawler.stats.inc_value('pause_controller/pauses')
+        elif self.paused_since is not None:
+            logger.info("Resuming crawl")
+            engine.unpause()
+            self._record_pause()
+            # Don't wait for the engine heartbeat to pick up the next request
+            slot = getattr(engine, 'slot', None) or getattr(engine, '_slot', None)
+            if slot is not None:
+                slot.nextcall.schedule()
+
+    def _record_pause(self):
+        paused = time.monotonic() - self.paused_since
+        self.paused_since = None
+        self.crawler.stats.inc_value('pause_controller/paused_seconds', round(paused, 3))
@@ -0,0 +1,116 @@
+# Fallback chain for parent requests that fail before any response.
+#
+# Parent URLs are requested as https://<domain>. When that fails with a DNS,
+# TLS, connection refused or timeout error, the next variant of the chain
+#   https://www.<domain>, http://<domain>, http://www.<domain>
+# is scheduled from the errback, with high priority and the original
+# parent_url. What failed decides which variants are still worth trying:
+#   dns       the host doesn't resolve: skip the variants on the same host
+#   tls       TLS handshake failed: skip the remaining https variants
+#   refused   nothing listens on that port: skip the variants with that scheme
+#   timeout   the host swallows connections: stop the chain
+# HTTP errors mean the site answered, so they never start a fallback.
+
+import ipaddress
+from urllib.parse import urlsplit
+
+from OpenSSL import SSL
+from twisted.internet.error import ConnectionRefusedError, DNSLookupError, TCPTimedOutError, TimeoutError
+from twisted.web._newclient import ResponseFailed, ResponseNeverReceived
+
+
+# (name, scheme, www) in the order they are tried
+VARIANTS = (
+    ('https', 'https', False),
+    ('https_www', 'https', True),
+    ('http', 'http', False),
+    ('http_www', 'http', True),
+)
+
+
+def failure_reason(failure):
+    """'dns', 'tls', 'refused' or 'timeout' for a failure the chain handles, else None."""
+    if failure.check(DNSLookupError):
+        return 'dns'
+    if failure.check(ConnectionRefusedError):
+        return 'refused'
+    if failure.check(TimeoutError, TCPTimedOutError):
+        return 'timeout'
+    if failure.check(SSL.Error):
+        return 'tls'
+    if failure.check(ResponseNeverReceived, ResponseFailed):
+        if any(reason.check(SSL.Error) for reason in failure.value.reasons):
+            return 'tls'
+    return None
+
+
+def _is_ip_address(host):
+    try:
+        ipaddress.ip_address(host)
+    except ValueError:
+        return False
+    return True
+
+
+class FallbackChain:
+
+    def __init__(self, stats=None, priority=100):
+        self.stats = stats
+        self.priority = priority
+
+    def _inc(self, key):
+        if self.stats is not None:
+            self.stats.inc_value(f'fallback/{key}')
+
+    @staticmethod
+    def variants(url):
+        """(name, url) of every variant of a parent URL, www. stripped from its host."""
+        parts = urlsplit(url)
+        netloc = parts.netloc[4:] if parts.netloc.startswith('www.') else parts.netloc
+        www_allowed = not _is_ip_address(parts.hostname or '')
+        return [
+            (name, parts._replace(scheme=scheme, netloc=f'www.{netloc}' if www else netloc).geturl())
+            for name, scheme, www in VARIANTS
+            if www_allowed or not www
+        ]
+
+    def next_request(self, failure):
+        """The request for the next variant after a failed parent request, or None."""
+        request = failure.request
+        if not request.meta.get('is_parent'):
+            return None
+        reason = failure_reason(failure)
+        if reason is None:
+            return None
+        self._inc(f'failed/{reason}')
+        if reason == 'timeout':
+            self._inc('stopped/timeout')
+            return None
+
+        failed = urlsplit(request.url)
+        dead = set(request.meta.get('fallback_dead', ()))
+        if reason == 'dns':
+            dead.add(('host', failed.hostname))
+        elif reason == 'tls':
+            dead.add(('scheme', 'https'))
+        else:
+            dead.add(('scheme', failed.scheme))
+        tried = set(request.meta.get('fallback_tried', ())) | {request.url}
+
+        for name, url in self.variants(request.meta.get('parent_url', request.url)):
+            parts = urlsplit(url)
+            if url in tried or ('host', parts.hostname) in dead or ('scheme', parts.scheme) in dead:
+                continue
+            self._inc(f'scheduled/{name}')
+            meta = dict(request.meta, fallback_variant=name, fallback_dead=sorted(dead), fallback_tried=sorted(tried))
+            # Retry bookkeeping belongs to the failed URL, not to the new variant
+            meta.pop('retry_times', None)
+            return request.replace(url=url, priority=self.priority, meta=meta, dont_filter=True)
+
+        self._inc('exhausted')
+        return None
+
+    def record_success(self, response):
+        """Count which variant a parent page was finally fetched with."""
+        if response.meta.get('is_parent'):
+            self._inc(f"succeeded/{response.meta.get('fallback_variant', 'https')}")
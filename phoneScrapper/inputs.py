@@ -0,0 +1,113 @@
+# Streaming readers for domain list files.
+#
+# Domain lists used to be loaded whole with pandas, twice, on the GUI thread
+# and then pickled into the crawler process. They are now read lazily, one
+# row at a time, inside the crawler process:
+#   .xlsx / .xlsm   first column of the first sheet, openpyxl read-only mode
+#   .csv            first column
+#   anything else   one domain per line (.txt, ...)
+# Any of them may be gzip-compressed (.csv.gz, .txt.gz, ...); .xlsx files
+# are zip archives already. A crawl's input is a list of domains and/or a
+# list file; iter_input_rows numbers the file's rows on from the list's, so
+# row numbers (see domains.DomainPrepass) are unique across both.
+
+import csv
+import gzip
+import io
+
+from openpyxl import load_workbook
+
+
+EXCEL_SUFFIXES = ('.xlsx', '.xlsm')
+
+# Filter for the GUI file dialogs
+FILE_DIALOG_FILTER = "Domain lists (*.xlsx *.xlsm *.csv *.txt *.gz);;Excel files (*.xlsx *.xlsm);;All files (*)"
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def _base_name(path):
+    path = str(path).lower()
+    return path[:-3] if path.endswith('.gz') else path
+
+
+def _open_binary(path):
+    return gzip.open(path, 'rb') if str(path).lower().endswith('.gz') else open(path, 'rb')
+
+
+def _open_text(path):
+    return io.TextIOWrapper(_open_binary(path), encoding='utf-8-sig', errors='replace', newline='')
+
+
+def _iter_excel(path):
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        for (value,) in workbook.worksheets[0].iter_rows(min_col=1, max_col=1, values_only=True):
+            yield value
+    finally:
+        workbook.close()
+
+
+def _iter_csv(path):
+    with _open_text(path) as f:
+        for row in csv.reader(f):
+            yield row[0] if row else None
+
+
+def _iter_lines(path):
+    with _open_text(path) as f:
+        for line in f:
+            yield line
+
+
+def iter_rows(path):
+    """Yield (row number, stripped entry) for every row of a list file, blank ones included."""
+    name = _base_name(path)
+    if name.endswith(EXCEL_SUFFIXES):
+        values = _iter_excel(path)
+    elif name.endswith('.csv'):
+        values = _iter_csv(path)
+    else:
+        values = _iter_lines(path)
+    for row, value in enumerate(values, 1):
+        yield row, '' if value is None else str(value).strip()
+
+
+def iter_input_rows(domains=None, path=None):
+    """
+    Yield (row number, entry) for the domains of a list, then for the rows
+    of the list file at path, numbered on from the last domain of the list.
+    """
+    row = 0
+    for row, domain in enumerate(domains or (), 1):
+        yield row, domain
+    if path:
+        for file_row, entry in iter_rows(path):
+            yield row + file_row, entry
+
+
+def count_domains(path):
+    """
+    Number of rows of a list file, for progress reporting. Cheap rather than
+    exact: blank rows are counted, and for workbooks the sheet's declared
+    dimensions are used when the file has them.
+    """
+    if _base_name(path).endswith(EXCEL_SUFFIXES):
+        workbook = load_workbook(path, read_only=True)
+        try:
+            sheet = workbook.worksheets[0]
+            if sheet.max_row and sheet.max_row > 1:
+                return sheet.max_row
+            # No declared dimensions: stream the rows as plain value tuples
+            return sum(1 for _ in sheet.iter_rows(values_only=True))
+        finally:
+            workbook.close()
+
+    count = 0
+    last = b'\n'
+    with _open_binary(path) as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    # Last line without a trailing newline
+    return count + (last != b'\n')
@@ -15,4 +15,6 @@ class PhoneScrapperItem(scrapy.Item):
     country_2 = scrapy.Field()
     phone_number_3 = scrapy.Field()
     country_3 = scrapy.Field()
+    # 'delta' or 'final', see results.py
+    record = scrapy.Field()
 
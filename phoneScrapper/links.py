@@ -0,0 +1,113 @@
+# Link classification for the parent-page link loop.
+#
+# All relevance keywords and social media domains are compiled into a single
+# alternation, so each href is lowercased once and scanned once. Instead of a
+# yes/no answer every link gets a relevance score (the sum of the weights of
+# the distinct keywords it contains) so callers can rank what to follow.
+#
+# The spider classifies all of a page's (href, anchor text) pairs at once
+# with classify_all. LinkFrontier turns those scores into the parent page's
+# follow list: links are penalized for path depth, then canonicalized,
+# deduped per parent URL and capped, best first. The spider releases a
+# parent's followed set once the parent is done.
+
+import re
+from collections import defaultdict, namedtuple
+from urllib.parse import urljoin, urlsplit
+
+from w3lib.url import canonicalize_url
+
+
+ClassifiedLink = namedtuple('ClassifiedLink', ['link', 'score', 'keywords', 'is_social'])
+
+ScoredLink = namedtuple('ScoredLink', ['url', 'score', 'classified'])
+
+# Anchor text longer than this is not a link label, only its start is scanned
+ANCHOR_TEXT_LENGTH = 200
+
+
+class LinkClassifier:
+
+    def __init__(self, keyword_weights, social_domains):
+        self.keyword_weights = dict(keyword_weights)
+        self.social_domains = frozenset(social_domains)
+        # Longest first so e.g. a domain is never shadowed by a keyword it contains
+        terms = sorted(set(self.keyword_weights) | self.social_domains, key=len, reverse=True)
+        self.regex = re.compile('|'.join(re.escape(term.lower()) for term in terms))
+
+    def classify(self, link, text=None):
+        """Score link on its href and, if given, its anchor text."""
+        found = set(self.regex.findall(link.lower()))
+        keywords = found - self.social_domains
+        if text:
+            keywords |= set(self.regex.findall(text[:ANCHOR_TEXT_LENGTH].lower())) - self.social_domains
+        score = sum(self.keyword_weights[keyword] for keyword in keywords)
+        return ClassifiedLink(link, score, keywords, bool(found & self.social_domains))
+
+    def classify_all(self, anchors):
+        """Classify a page's (href, anchor text) pairs at once; repeated pairs are only scanned once."""
+        classified = {}
+        results = []
+        for anchor in anchors:
+            result = classified.get(anchor)
+            if result is None:
+                result = classified[anchor] = self.classify(*anchor)
+            results.append(result)
+        return results
+
+
+class LinkFrontier:
+    """Chooses which links of a parent page to follow, and in what order."""
+
+    def __init__(self, max_follows=6, depth_penalty=1):
+        self.max_follows = max_follows
+        self.depth_penalty = depth_penalty
+        # parent_url -> canonical URLs already followed for it
+        self.followed = defaultdict(set)
+
+    @staticmethod
+    def canonical(url):
+        """Dedupe key: canonical URL without fragment or trailing slash."""
+        return canonicalize_url(url).rstrip('/')
+
+    def score(self, classified, url):
+        """Keyword score minus the depth penalty, never below 1 for a relevant link."""
+        depth = len([segment for segment in urlsplit(url).path.split('/') if segment])
+        return max(classified.score - self.depth_penalty * max(depth - 1, 0), 1)
+
+    def select(self, parent_url, base_url, classified_links):
+        """
+        Rank the classified links of a page (see LinkClassifier.classify_all),
+        whose hrefs are relative to base_url. Returns the links to follow,
+        best first and at most max_follows per parent overall, and the
+        number of social media links skipped.
+        """
+        followed = self.followed[parent_url]
+        if not followed:
+            followed.add(self.canonical(parent_url))
+        candidates = {}
+        social_links = 0
+        for classified in classified_links:
+            if classified.is_social:
+                social_links += 1
+                continue
+            if classified.score <= 0:
+                continue
+            url = urljoin(base_url, classified.link.strip())
+            if urlsplit(url).scheme not in ('http', 'https'):
+                continue
+            canonical = self.canonical(url)
+            if canonical in followed:
+                continue
+            score = self.score(classified, url)
+            if canonical not in candidates or candidates[canonical].score < score:
+                candidates[canonical] = ScoredLink(url, score, classified)
+
+        remaining = max(self.max_follows - (len(followed) - 1), 0)
+        ranked = sorted(candidates.items(), key=lambda candidate: candidate[1].score, reverse=True)[:remaining]
+        followed.update(canonical for canonical, _ in ranked)
+        return [link for _, link in ranked], social_links
+
+    def release(self, parent_url):
+        """Forget the links followed for a parent that is done."""
+        self.followed.pop(parent_url, None)
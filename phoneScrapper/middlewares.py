@@ -3,7 +3,10 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+from collections import defaultdict
+
 from scrapy import signals
+from scrapy.exceptions import IgnoreRequest, StopDownload
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
@@ -101,3 +104,92 @@ class PhonescrapperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class SatisfiedParentMiddleware:
+    """
+    Cancels the follow-up requests (contact, about, service pages, ...) of a
+    parent URL once the spider has all the phone numbers it needs for it,
+    as answered by spider.is_parent_satisfied(parent_url).
+
+    Requests still waiting in the scheduler are dropped when they reach the
+    downloader; requests already downloading are aborted as soon as their
+    headers arrive. Parent requests themselves are never cancelled.
+    """
+
+    def __init__(self, stats):
+        self.stats = stats
+        # parent_url -> follow-up requests scheduled and not finished yet
+        self.outstanding = defaultdict(int)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = cls(crawler.stats)
+        crawler.signals.connect(s.request_scheduled, signal=signals.request_scheduled)
+        # Scheduled but rejected by the scheduler (dupefilter): never downloaded
+        crawler.signals.connect(s._finished, signal=signals.request_dropped)
+        crawler.signals.connect(s.response_received, signal=signals.response_received)
+        crawler.signals.connect(s.headers_received, signal=signals.headers_received)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
+        return s
+
+    @staticmethod
+    def follow_up_parent(request):
+        """The parent URL of a follow-up request, None for parent requests."""
+        if request.meta.get('is_parent'):
+            return None
+        return request.meta.get('parent_url')
+
+    @staticmethod
+    def is_satisfied(spider, parent_url):
+        is_parent_satisfied = getattr(spider, 'is_parent_satisfied', None)
+        return is_parent_satisfied is not None and is_parent_satisfied(parent_url)
+
+    def request_scheduled(self, request, spider):
+        parent_url = self.follow_up_parent(request)
+        # Retries carry the flag over and are not counted twice
+        if parent_url is not None and not request.meta.get('satisfied_parent_outstanding'):
+            request.meta['satisfied_parent_outstanding'] = True
+            self.outstanding[parent_url] += 1
+
+    def response_received(self, response, request, spider):
+        self._finished(request)
+
+    def process_request(self, request, spider):
+        parent_url = self.follow_up_parent(request)
+        if parent_url is not None and self.is_satisfied(spider, parent_url):
+            self._finished(request)
+            self.stats.inc_value('satisfied_parent/dropped')
+            raise IgnoreRequest(
+                f"Parent {parent_url} already has its phone numbers "
+                f"({self.outstanding.get(parent_url, 0)} more requests outstanding)"
+            )
+        return None
+
+    def headers_received(self, headers, body_length, request, spider):
+        parent_url = self.follow_up_parent(request)
+        if parent_url is not None and self.is_satisfied(spider, parent_url):
+            request.meta['satisfied_parent_aborted'] = True
+            raise StopDownload(fail=True)
+
+    def process_exception(self, request, exception, spider):
+        # Runs last in the chain: no other middleware is retrying this request
+        self._finished(request)
+        if isinstance(exception, StopDownload) and request.meta.get('satisfied_parent_aborted'):
+            self.stats.inc_value('satisfied_parent/aborted')
+            # Ignored requests are not reported as download errors
+            raise IgnoreRequest(f"Parent {request.meta['parent_url']} already has its phone numbers")
+        return None
+
+    def spider_closed(self, spider):
+        saved = sum(self.stats.get_value(f'satisfied_parent/{key}', 0) for key in ('dropped', 'aborted'))
+        self.stats.set_value('satisfied_parent/saved', saved)
+        spider.logger.info(f"Cancelled {saved} requests for parent URLs that already had their phone numbers")
+
+    def _finished(self, request):
+        if not request.meta.pop('satisfied_parent_outstanding', False):
+            return
+        parent_url = request.meta['parent_url']
+        self.outstanding[parent_url] -= 1
+        if self.outstanding[parent_url] <= 0:
+            del self.outstanding[parent_url]
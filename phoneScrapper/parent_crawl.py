@@ -0,0 +1,254 @@
+# Parent URL crawl shared by the spiders (phone_scrapper, phone_scrapy3).
+#
+# Everything around a spider's extraction: reading and deduping the input,
+# the parent page loop (delta records, link following), the fallback chain
+# for parents that fail, per-domain progress (see progress.DomainTracker)
+# and the final record of every parent (see results.py). A spider mixes in
+# ParentCrawlMixin before scrapy.Spider and provides extract_phone_numbers,
+# convert_to_url, link_classifier and record_stats.
+#
+# A parent's final record is yielded as an item, so it goes through the item
+# pipelines and the feeds like any other: by the callback or errback that
+# finishes the parent, or by the next one when a dropped request finished
+# it. Records still waiting when the spider goes idle are yielded from a
+# data: request. Parents cut short by the end of the crawl (shutdown,
+# CLOSESPIDER_*) are only known once Scrapy has closed the item pipelines;
+# their final records are sent to the item_scraped receivers from
+# spider_closed, which is connected before the feed exporter's so the feeds
+# still get them. The runner reports the end of the crawl on engine_stopped,
+# after every spider_closed receiver.
+
+import scrapy
+from scrapy import signals
+from scrapy.exceptions import DontCloseSpider
+from scrapy.spidermiddlewares.httperror import HttpError
+from twisted.internet.error import DNSLookupError, TimeoutError
+
+from phoneScrapper.dns_prepass import DnsCache
+from phoneScrapper.domains import DomainPrepass
+from phoneScrapper.fallback import FallbackChain
+from phoneScrapper.inputs import iter_input_rows
+from phoneScrapper.links import LinkFrontier
+from phoneScrapper.prescan import has_phone_candidates
+from phoneScrapper.progress import DomainTracker
+from phoneScrapper.results import DELTA, SLOTS, result_item
+
+
+# Request yielding the final records left over when the spider goes idle
+FLUSH_URL = 'data:,'
+
+
+class ParentCrawlMixin:
+
+    unwanted_extensions = ('.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg',
+                           '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv',
+                           '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.pdf',
+                           '.zip', '.rar', '.tar', '.gz', '.7z',
+                           '.js', '.css')
+
+    def __init__(self, domains=None, pause_event=None, input_path=None, shard=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.domains = domains or []
+        # Domain list file (.xlsx, .csv, .txt, optionally gzipped) streamed by start_requests
+        self.input_path = input_path
+        self.pause_event = pause_event
+        self.urls_scraped = 0
+        self.total_urls = len(self.domains)
+        self.visited_urls = set()
+        self.processed_urls = set()
+        self.parent_url_phone_numbers = {}
+        # Final records of the parents done, until a callback yields them
+        self.final_records = []
+        self.link_frontier = LinkFrontier()
+        # shard=(index, count) when the list is split over crawler processes
+        self.domain_prepass = DomainPrepass(self.convert_to_url, shard=shard)
+        # Started, finished and failed events per domain (see progress.py)
+        self.domain_tracker = DomainTracker(lambda parent_url: len(self.parent_url_phone_numbers.get(parent_url, ())))
+        self.domain_prepass.on_skipped = self.domain_tracker.skipped
+        self.domain_tracker.on_finished = self.parent_done
+        self.dns_cache = None
+        self.fallback_chain = FallbackChain()
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        # crawler.stats only exists once the crawl starts
+        crawler.signals.connect(spider.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(spider.spider_idle, signal=signals.spider_idle)
+        # Before the feed exporter's receiver, which is connected once the spider exists
+        crawler.signals.connect(spider.spider_closed, signal=signals.spider_closed)
+        spider.domain_tracker.connect(crawler.signals)
+        spider.link_frontier.max_follows = crawler.settings.getint('MAX_FOLLOWS_PER_PARENT', spider.link_frontier.max_follows)
+        spider.domain_prepass.row_map_path = crawler.settings.get('DOMAIN_ROW_MAP')
+        spider.domain_prepass.deduper.max_memory = crawler.settings.getint('DOMAIN_DEDUPE_MEMORY', spider.domain_prepass.deduper.max_memory)
+        if crawler.settings.getbool('DNS_PREPASS_ENABLED'):
+            # Filled by dns_prepass.pre_resolve_input before the crawl
+            spider.dns_cache = DnsCache.from_settings(crawler.settings)
+            spider.domain_prepass.host_filter = spider.dns_cache.check
+        return spider
+
+    def spider_opened(self, spider):
+        self.fallback_chain.stats = self.crawler.stats
+        self.domain_tracker.stats = self.crawler.stats
+
+    def iter_input_rows(self):
+        """
+        (row number, entry) for the domains given to the spider, then for the
+        rows read lazily from input_path, numbered on from the domains.
+        """
+        return iter_input_rows(self.domains, self.input_path)
+
+    def start_requests(self):
+        if self.input_path:
+            self.logger.info(f"Starting requests for {len(self.domains)} URLs and the domains in {self.input_path}")
+        else:
+            self.logger.info(f"Starting requests for {len(self.domains)} URLs")
+        # Canonical domains, each crawled once; see DOMAIN_ROW_MAP for what happened to every row
+        for domain in self.domain_prepass.run(self.iter_input_rows()):
+            url = self.convert_to_url(domain)
+            self.logger.info(f"Requesting URL: {url}")
+            yield scrapy.Request(url=url, callback=self.parse, errback=self.errback_handle, meta={'parent_url': url, 'is_parent': True})
+
+    def parse(self, response):
+        # The page's request is done for its domain once everything it yields is scheduled
+        yield from self.domain_tracker.track(response.request, self.parse_page(response))
+        yield from self.pop_final_records()
+
+    def parse_page(self, response):
+        parent_url = response.meta.get('parent_url')
+        is_parent = response.meta.get('is_parent', False)
+        self.logger.info(f"Parsing URL: {response.url} with parent: {parent_url}")
+        self.fallback_chain.record_success(response)
+
+        # Skip unwanted file types
+        if any(response.url.lower().endswith(ext) for ext in self.unwanted_extensions):
+            self.logger.info(f"Skipping unwanted file type: {response.url}")
+            return
+
+        # Avoid revisiting the same URL
+        if response.url in self.visited_urls:
+            self.logger.info(f"Already visited URL: {response.url}")
+            return
+        self.visited_urls.add(response.url)
+
+        # Extract phone numbers from the current page, unless the raw body
+        # has no candidate digit run at all (then only follow its links)
+        if has_phone_candidates(response):
+            phone_numbers_with_countries = self.extract_phone_numbers(response)
+        else:
+            self.logger.debug(f"No phone number candidates in {response.url}, skipping extraction")
+            self.crawler.stats.inc_value('prescan/short_circuited')
+            phone_numbers_with_countries = []
+        if phone_numbers_with_countries:
+            if parent_url not in self.processed_urls:
+                self.processed_urls.add(parent_url)
+            if parent_url not in self.parent_url_phone_numbers:
+                # Insertion ordered: a number keeps the slot it was first sent in
+                self.parent_url_phone_numbers[parent_url] = {}
+            known_phone_numbers = self.parent_url_phone_numbers[parent_url]
+            new_phone_numbers = [number for number in dict.fromkeys(phone_numbers_with_countries) if number not in known_phone_numbers]
+            if new_phone_numbers:
+                first_slot = len(known_phone_numbers)
+                known_phone_numbers.update(dict.fromkeys(new_phone_numbers))
+                self.logger.info(f"Extracted phone numbers: {new_phone_numbers} from {response.url}")
+
+                # Yield only the new phone numbers; the parent's final record follows when it is done
+                if parent_url in self.processed_urls and first_slot < SLOTS:
+                    self.logger.info(f"Extracted phone numbers: {new_phone_numbers} to parent {parent_url}")
+                    self.crawler.stats.inc_value('results/delta')
+                    yield result_item(parent_url, new_phone_numbers, first_slot, DELTA)
+
+                # Stop if we already have 3 phone numbers for this parent URL
+                if len(self.parent_url_phone_numbers[parent_url]) >= 3:
+                    return
+
+        # Follow only specific links if this is the parent URL
+        if is_parent and len(self.parent_url_phone_numbers.get(parent_url, [])) < 3:
+            anchors = [(a.get('href'), a.text_content()) for a in response.selector.root.iter('a') if a.get('href')]
+            self.logger.info(f"Found {len(anchors)} links on {response.url}")
+            # Best links first, deduped and capped per parent; higher score = higher request priority
+            classified_links = self.link_classifier.classify_all(anchors)
+            links, social_links = self.link_frontier.select(parent_url, response.url, classified_links)
+            if social_links:
+                self.logger.info(f"Skipping {social_links} social media links on {response.url}")
+            for link in links:
+                self.logger.info(f"Following relevant link: {link.url} (score {link.score})")
+                yield response.follow(link.url, self.parse, errback=self.errback_follow_up, priority=link.score, meta={'parent_url': parent_url})
+
+    def is_parent_satisfied(self, parent_url):
+        """
+        True once three phone numbers were found for parent_url; its pending
+        follow-up requests are then cancelled by SatisfiedParentMiddleware.
+        """
+        return len(self.parent_url_phone_numbers.get(parent_url, ())) >= 3
+
+    def errback_handle(self, failure):
+        yield from self.domain_tracker.track(failure.request, self.handle_failure(failure), failure)
+        yield from self.pop_final_records()
+
+    def errback_follow_up(self, failure):
+        # A follow-up page failing doesn't fail its domain
+        self.logger.error(repr(failure))
+        self.domain_tracker.done(failure.request, failure)
+        return self.pop_final_records()
+
+    def handle_failure(self, failure):
+        self.logger.error(repr(failure))
+
+        if failure.check(HttpError):
+            response = failure.value.response
+            self.logger.error(f"HTTP error on {response.url}: {response.status}")
+        elif failure.check(DNSLookupError):
+            request = failure.request
+            self.logger.error(f"DNS lookup error on {request.url}")
+        elif failure.check(TimeoutError):
+            request = failure.request
+            self.logger.error(f"Timeout error on {request.url}")
+
+        # Parent URL without any response: try its next https/http, www. variant
+        fallback = self.fallback_chain.next_request(failure)
+        if fallback is not None:
+            self.logger.info(f"Trying {fallback.url} for {fallback.meta['parent_url']} after {failure.request.url} failed")
+            yield fallback
+
+    def parent_done(self, parent_url):
+        # DomainTracker.on_finished: none of the parent's pages is left to parse
+        self.processed_urls.discard(parent_url)
+        self.link_frontier.release(parent_url)
+        phone_numbers_with_countries = self.parent_url_phone_numbers.pop(parent_url, None)
+        if phone_numbers_with_countries:
+            self.final_records.append(result_item(parent_url, list(phone_numbers_with_countries)))
+
+    def pop_final_records(self):
+        """The final records of the parents done since the last call, to yield."""
+        records, self.final_records = self.final_records, []
+        if records:
+            self.crawler.stats.inc_value('results/final', len(records))
+        return records
+
+    def flush_final_records(self, response):
+        return self.pop_final_records()
+
+    def spider_idle(self, spider):
+        # Parents finished by a dropped request, with no callback left to yield their records
+        if spider is self and self.final_records:
+            self.crawler.engine.crawl(scrapy.Request(FLUSH_URL, callback=self.flush_final_records, dont_filter=True))
+            raise DontCloseSpider
+
+    def spider_closed(self, spider):
+        self.logger.info(f"Spider closed: {spider.name}")
+        if spider is self:
+            self.record_stats(self.crawler.stats)
+            self.domain_prepass.record_stats(self.crawler.stats)
+            self.domain_tracker.record_stats(self.crawler.stats)
+            self.logger.info(f"Domain list: {self.domain_prepass.summary()}")
+            self.domain_prepass.close()
+            if self.dns_cache is not None:
+                self.dns_cache.record_stats(self.crawler.stats)
+                self.dns_cache.close()
+            # Parents cut short by the end of the crawl: the item pipelines are
+            # closed already, the feeds aren't yet
+            for parent_url in list(self.parent_url_phone_numbers):
+                self.parent_done(parent_url)
+            for item in self.pop_final_records():
+                self.crawler.signals.send_catch_log(signal=signals.item_scraped, item=item, response=None, spider=self)
@@ -0,0 +1,44 @@
+# Multi-pattern phone matcher shared by the spiders.
+#
+# The prioritized patterns are compiled once per spider class. A text chunk
+# is only scanned if it holds enough digits for a number at all; then every
+# pattern is run over it on its own, so matches of different patterns may
+# overlap (e.g. "1 123-456-7890" gives both the 1-prefixed number and
+# "123-456-7890"), exactly like the old per-pattern findall loop. Results are
+# returned in priority order.
+
+import re
+
+
+DIGITS = '0123456789'
+
+
+class PhoneMatcher:
+
+    def __init__(self, patterns, min_digits=10):
+        self.patterns = list(patterns)
+        self.min_digits = min_digits
+        self.regexes = [re.compile(pattern) for pattern in self.patterns]
+
+    def has_candidate(self, text):
+        """Cheap pre-check: a chunk with fewer than min_digits digits can't hold a number."""
+        return sum(map(text.count, DIGITS)) >= self.min_digits
+
+    def matches(self, text):
+        """
+        Return (priority, start, number) tuples found in text, ordered by
+        pattern priority and then by position. priority is the index of the
+        matching pattern in self.patterns.
+        """
+        if not text or not self.has_candidate(text):
+            return []
+        return [(priority, match.start(), match.group())
+                for priority, regex in enumerate(self.regexes)
+                for match in regex.finditer(text)]
+
+    def scan(self, text):
+        """Return (priority, number) pairs found in text, see matches()."""
+        return [(priority, number) for priority, _, number in self.matches(text)]
+
+    def findall(self, text):
+        return [number for _, number in self.scan(text)]
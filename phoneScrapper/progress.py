@@ -0,0 +1,206 @@
+# Per-domain progress of a crawl.
+#
+# The GUIs used to count progress in items. Domains without a phone number
+# never produce one, and a parent URL can produce several (one per page
+# adding numbers, then again when the spider closes), so the progress bar
+# and the ETA were off for hours on large lists. DomainTracker follows the
+# requests of every parent URL instead and sends a domain_event signal:
+#   started   the domain's first request is scheduled
+#   finished  its last request is done and at least one page was fetched,
+#             with the number of phone numbers found
+#   failed    its last request is done and no page could be fetched, with
+#             the reason of the last failure (dns, timeout, http_404, ...)
+#   skipped   an input row that isn't crawled (a duplicate or rejected
+#             entry, see domains.DomainPrepass), so progress adds up to the
+#             number of rows
+#
+# A request counts for its domain from the moment it is scheduled until its
+# callback or errback has run to the end (after the requests it yields are
+# scheduled), or until the scheduler drops it. Retries and redirects carry
+# on the request they replace.
+#
+# CompletionRate turns the number of completed domains into an ETA, from an
+# exponentially weighted moving average of the completion rate.
+
+from collections import namedtuple
+
+from scrapy import signals
+from scrapy.exceptions import IgnoreRequest
+from scrapy.spidermiddlewares.httperror import HttpError
+
+from phoneScrapper.fallback import failure_reason
+
+
+STARTED = 'started'
+FINISHED = 'finished'
+FAILED = 'failed'
+SKIPPED = 'skipped'
+
+# url is the parent URL, or the input entry of a skipped row; reason is set
+# for failed and skipped domains
+DomainEvent = namedtuple('DomainEvent', ['kind', 'url', 'numbers', 'reason'])
+
+# Sent with event=DomainEvent(...)
+domain_event = object()
+
+# request.meta key of the requests counted for their domain
+PENDING_KEY = 'domain_pending'
+
+
+def describe_failure(failure):
+    """Short reason of a failed request: dns, tls, refused, timeout, http_404, ignored, ..."""
+    if failure.check(HttpError):
+        return f'http_{failure.value.response.status}'
+    if failure.check(IgnoreRequest):
+        return 'ignored'
+    return failure_reason(failure) or failure.type.__name__
+
+
+def split_batch(batch):
+    """(items, domain events) of a batch sent by the crawler (see runner.run_spider)."""
+    items = []
+    events = []
+    for entry in batch:
+        (events if isinstance(entry, DomainEvent) else items).append(entry)
+    return items, events
+
+
+class DomainTracker:
+
+    def __init__(self, numbers_for):
+        """
+        numbers_for(parent_url) is the number of phone numbers found for a
+        domain. on_finished(parent_url), if set, is called when a domain
+        finishes, before its event is sent.
+        """
+        self.numbers_for = numbers_for
+        self.on_finished = None
+        self.signals = None
+        self.stats = None
+        # parent_url -> requests counted and not done yet
+        self.pending = {}
+        # Domains in progress with a fetched page, and the last failure of the others
+        self.answered = set()
+        self.errors = {}
+
+    def connect(self, crawler_signals):
+        self.signals = crawler_signals
+        crawler_signals.connect(self.request_scheduled, signal=signals.request_scheduled)
+        crawler_signals.connect(self.request_dropped, signal=signals.request_dropped)
+
+    def request_scheduled(self, request, spider):
+        parent_url = request.meta.get('parent_url')
+        if parent_url is None or request.meta.get(PENDING_KEY):
+            return
+        request.meta[PENDING_KEY] = True
+        if parent_url not in self.pending:
+            self.pending[parent_url] = 0
+            self._send(STARTED, parent_url)
+        self.pending[parent_url] += 1
+
+    def request_dropped(self, request, spider):
+        # Filtered by the scheduler, no callback will run
+        if request.meta.pop(PENDING_KEY, False):
+            self._request_done(request.meta['parent_url'], reason='dropped')
+
+    def track(self, request, output, failure=None):
+        """
+        Pass on the output of request's callback (or errback, with failure);
+        the request is done once the output is exhausted. Requests made from
+        request.meta in the meantime are counted on their own.
+        """
+        counted = request.meta.pop(PENDING_KEY, False)
+        try:
+            yield from output
+        finally:
+            if counted:
+                self._done_with(request, failure)
+
+    def done(self, request, failure=None):
+        """Count request as done: fetched, or failed with failure."""
+        if request.meta.pop(PENDING_KEY, False):
+            self._done_with(request, failure)
+
+    def _done_with(self, request, failure):
+        if failure is None:
+            self._request_done(request.meta['parent_url'], answered=True)
+        else:
+            self._request_done(request.meta['parent_url'], reason=describe_failure(failure))
+
+    def _request_done(self, parent_url, answered=False, reason=None):
+        if answered:
+            self.answered.add(parent_url)
+        elif reason:
+            self.errors[parent_url] = reason
+        self.pending[parent_url] -= 1
+        if self.pending[parent_url] > 0:
+            return
+        del self.pending[parent_url]
+        reason = self.errors.pop(parent_url, None)
+        if parent_url in self.answered:
+            self.answered.discard(parent_url)
+            numbers = self.numbers_for(parent_url)
+            if self.on_finished is not None:
+                self.on_finished(parent_url)
+            self._send(FINISHED, parent_url, numbers)
+        else:
+            self._send(FAILED, parent_url, reason=reason or 'unknown')
+
+    def skipped(self, row, entry, status):
+        """DomainPrepass.on_skipped"""
+        self._send(SKIPPED, str(entry), reason=status)
+
+    def _send(self, kind, url, numbers=0, reason=None):
+        if self.stats is not None:
+            self.stats.inc_value(f'domains/{kind}')
+            if kind == FAILED:
+                self.stats.inc_value(f'domains/failed/{reason}')
+        if self.signals is not None:
+            self.signals.send_catch_log(signal=domain_event, event=DomainEvent(kind, url, numbers, reason))
+
+    def record_stats(self, stats):
+        # Domains cut short by the end of the crawl (shutdown, CLOSESPIDER_*)
+        if self.pending:
+            stats.set_value('domains/unfinished', len(self.pending))
+
+
+class CompletionRate:
+    """
+    Domains completed per second, as an exponentially weighted moving average
+    with a half-life of half_life seconds, sampled at most once every
+    min_interval seconds. The first rate is the average since the first
+    sample, taken once something has completed.
+    """
+
+    def __init__(self, half_life=30.0, min_interval=1.0):
+        self.half_life = half_life
+        self.min_interval = min_interval
+        self.rate = None
+        self.last_time = None
+        self.last_completed = 0
+
+    def update(self, completed, now):
+        if self.last_time is None:
+            self.last_time = now
+            self.last_completed = completed
+            return
+        elapsed = now - self.last_time
+        if elapsed < self.min_interval:
+            return
+        rate = (completed - self.last_completed) / elapsed
+        if self.rate is None:
+            if completed == self.last_completed:
+                return
+            self.rate = rate
+        else:
+            self.rate += (1 - 0.5 ** (elapsed / self.half_life)) * (rate - self.rate)
+        self.last_time = now
+        self.last_completed = completed
+
+    def eta(self, remaining):
+        """Seconds until remaining more domains are completed, None while unknown."""
+        if remaining <= 0:
+            return 0.0
+        if not self.rate:
+            return None
+        return remaining / self.rate
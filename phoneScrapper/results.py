@@ -0,0 +1,53 @@
+# Result records of a crawl: upserts keyed by parent URL.
+#
+# parse used to yield a full item every time a parent URL gained numbers,
+# and spider_closed sent every parent's item once more, so each domain
+# reached the GUI, the feeds and the command line two or more times and the
+# consumers had to find the URL again to merge them. Items are now records
+# with a 'record' field:
+#   delta  sent while crawling: only the numbers just found, in the
+#          phone_number_N/country_N slots they take (a slot is never
+#          reassigned)
+#   final  sent once, when the parent is done (see progress.DomainTracker):
+#          all its numbers, in the same slots
+# A parent's final record comes after all of its deltas. Applying a record
+# means setting its fields on the parent URL's result, a final record
+# replacing it, so consumers need nothing more than a dict keyed by URL.
+# File feeds and the command line only keep the final records
+# (FinalRecordFilter); the GUIs apply both.
+
+from phoneScrapper.items import PhoneScrapperItem
+
+
+DELTA = 'delta'
+FINAL = 'final'
+
+# Numbers per result
+SLOTS = 3
+
+
+def result_item(parent_url, numbers, first_slot=0, record=FINAL):
+    """
+    Record for parent_url with numbers, (number, country) pairs, in the
+    slots from first_slot (0-based) on; numbers past the last slot are left out.
+    """
+    item = PhoneScrapperItem(url=parent_url, record=record)
+    for slot, (phone_number, country_code) in enumerate(numbers[:max(SLOTS - first_slot, 0)], first_slot + 1):
+        item[f'phone_number_{slot}'] = phone_number
+        item[f'country_{slot}'] = country_code
+    return item
+
+
+def is_final(item):
+    # Items without a record field are complete results too
+    return item.get('record', FINAL) == FINAL
+
+
+class FinalRecordFilter:
+    """FEEDS item_filter keeping only the final records."""
+
+    def __init__(self, feed_options):
+        self.feed_options = feed_options
+
+    def accepts(self, item):
+        return is_final(item)
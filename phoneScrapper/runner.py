@@ -0,0 +1,295 @@
+# Running the crawler without the GUI.
+#
+# crawl() runs one crawl in the calling process: project settings, a
+# settings profile and overrides, the optional DNS pre-resolution stage,
+# then a CrawlerProcess. run_spider() is the target of the GUIs' crawler
+# process, and the headless command line (phoneScrapper.cli) calls crawl()
+# directly. Nothing here imports PyQt.
+#
+# A single CrawlerProcess uses one CPU core, and extraction keeps it busy
+# long before the network is. crawl_sharded() splits the domains over
+# several crawler processes instead (CRAWL_SHARDS, one per core by
+# default): every shard reads the whole input but only crawls the domains
+# that hash to it, and sends its items back over one queue. The calling
+# process merges them into one stream, in which the items of a parent URL
+# keep the order they were scraped in, and combines the shards' stats and
+# domain row maps.
+#
+# Items cross process boundaries in batches (see transport.py), together
+# with the spider's per-domain events (see progress.py).
+
+import csv
+import heapq
+import logging
+import multiprocessing
+import os
+import time
+from queue import Empty
+
+from scrapy import signals
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.log import configure_logging
+from scrapy.utils.project import get_project_settings
+
+from phoneScrapper.dns_prepass import pre_resolve_input
+from phoneScrapper.domains import ROW_MAP_FIELDS
+from phoneScrapper.profiles import apply_profile
+from phoneScrapper.progress import DomainEvent, domain_event
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+from phoneScrapper.transport import END, BatchSender
+
+
+logger = logging.getLogger(__name__)
+
+# Seconds between progress messages of crawl_sharded
+PROGRESS_INTERVAL = 30
+
+
+def project_settings(profile=None, overrides=None):
+    """
+    The project settings with a settings profile applied, then overrides (a
+    dict) at command line priority.
+    """
+    # The project has no scrapy.cfg to point Scrapy at its settings
+    os.environ.setdefault('SCRAPY_SETTINGS_MODULE', 'phoneScrapper.settings')
+    settings = get_project_settings()
+    apply_profile(settings, profile)
+    settings.setdict(overrides or {}, priority='cmdline')
+    return settings
+
+
+def crawl(domains=None, input_path=None, profile=None, overrides=None, spider_cls=PhoneScrapperSpider,
+          item_callback=None, closed_callback=None, event_callback=None, pre_resolve=True, **spider_kwargs):
+    """
+    Crawl domains and/or the domain list file input_path, calling
+    item_callback(item) for every scraped item, event_callback(event) for
+    every progress.DomainEvent and closed_callback() once the crawl is over.
+    Returns the crawl stats.
+
+    This starts a Twisted reactor, which can't be restarted: one crawl per process.
+    """
+    settings = project_settings(profile, overrides)
+    if pre_resolve:
+        # Optional DNS_PREPASS_ENABLED stage, on its own event loop before the reactor starts
+        pre_resolve_input(settings, domains, input_path)
+    # Built after the profile is applied: the process reads the threadpool and DNS cache sizes
+    process = CrawlerProcess(settings=settings)
+    crawler = process.create_crawler(spider_cls)
+
+    if item_callback is not None:
+        def item_scraped(item, response, spider):
+            item_callback(item)
+        crawler.signals.connect(item_scraped, signal=signals.item_scraped, weak=False)
+    if event_callback is not None:
+        def domain_event_sent(event):
+            event_callback(event)
+        crawler.signals.connect(domain_event_sent, signal=domain_event, weak=False)
+    if closed_callback is not None:
+        # After every spider_closed receiver, which may still send final records
+        def engine_stopped():
+            closed_callback()
+        crawler.signals.connect(engine_stopped, signal=signals.engine_stopped, weak=False)
+
+    # A domain list file is streamed by the spider inside this process
+    process.crawl(crawler, domains=domains, input_path=input_path, **spider_kwargs)
+    process.start()
+    return crawler.stats.get_stats()
+
+
+def shard_path(path, index):
+    """File name for one shard's copy of an output file: rows.csv -> rows.shard0.csv"""
+    root, ext = os.path.splitext(path)
+    return f'{root}.shard{index}{ext}'
+
+
+def _shard_feeds(feeds, index):
+    # Every shard writes its own copy of file feeds; other URIs are left alone
+    return {
+        (shard_path(uri, index) if '://' not in str(uri) and not str(uri).startswith('stdout:') else uri): options
+        for uri, options in feeds.items()
+    }
+
+
+def merge_stats(all_stats):
+    """
+    Combined stats of several crawls: counts are added up, maxima and times
+    combined, and the first finish reason other than 'finished' is kept.
+    """
+    merged = {}
+    for stats in all_stats:
+        for key, value in stats.items():
+            if key not in merged:
+                merged[key] = value
+            elif key == 'start_time':
+                merged[key] = min(merged[key], value)
+            elif key == 'finish_time' or key.endswith('max'):
+                merged[key] = max(merged[key], value)
+            elif key == 'finish_reason':
+                if merged[key] == 'finished':
+                    merged[key] = value
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                merged[key] += value
+    if 'start_time' in merged and 'finish_time' in merged:
+        merged['elapsed_time_seconds'] = (merged['finish_time'] - merged['start_time']).total_seconds()
+    return merged
+
+
+def merge_row_maps(paths, path):
+    """Merge the shards' domain row maps into path, ordered by row, and remove them."""
+    paths = [shard for shard in paths if os.path.exists(shard)]
+    files = [open(shard, newline='', encoding='utf-8') for shard in paths]
+    try:
+        readers = [csv.reader(f) for f in files]
+        for reader in readers:
+            next(reader, None)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(ROW_MAP_FIELDS)
+            writer.writerows(heapq.merge(*readers, key=lambda row: int(row[0])))
+    finally:
+        for f in files:
+            f.close()
+    for shard in paths:
+        os.remove(shard)
+
+
+def _batch_sender(send, settings):
+    return BatchSender(send, settings.getint('ITEM_BATCH_SIZE', 200), settings.getfloat('ITEM_BATCH_INTERVAL', 0.1))
+
+
+def _crawl_shard(index, count, queue, domains, input_path, profile, overrides, spider_cls, pause_event):
+    """Target of a shard's crawler process."""
+    sender = _batch_sender(lambda batch: queue.put(('items', batch)), project_settings(profile, overrides))
+    try:
+        stats = crawl(
+            domains,
+            input_path,
+            profile=profile,
+            overrides=overrides,
+            spider_cls=spider_cls,
+            item_callback=lambda item: sender.add(dict(item)),
+            event_callback=sender.add,
+            pre_resolve=False,
+            shard=(index, count),
+            pause_event=pause_event,
+        )
+    finally:
+        sender.close()
+    # After all the items of this shard on the same queue
+    queue.put(('done', index, stats))
+
+
+def crawl_sharded(domains=None, input_path=None, shards=None, profile=None, overrides=None,
+                  spider_cls=PhoneScrapperSpider, item_callback=None, closed_callback=None, event_callback=None,
+                  pause_event=None):
+    """
+    Like crawl(), with the domains split over shards crawler processes (one
+    per CPU core by default). item_callback(item) and event_callback(event)
+    are called in this process for the items and domain events of all
+    shards as they arrive, closed_callback() once every shard is done.
+    Returns the combined stats.
+
+    Concurrency settings apply to each shard. File FEEDS and DOMAIN_ROW_MAP
+    get a .shardN suffix per shard; the row maps are merged back at the end.
+    """
+    shards = shards or os.cpu_count() or 1
+    settings = project_settings(profile, overrides)
+    configure_logging(settings)
+    # Once for all shards, which only read the DNS cache
+    pre_resolve_input(settings, domains, input_path)
+
+    row_map = settings.get('DOMAIN_ROW_MAP')
+    queue = multiprocessing.Queue()
+    processes = {}
+    for index in range(shards):
+        shard_overrides = dict(overrides or {}, FEEDS=_shard_feeds(settings.getdict('FEEDS'), index))
+        if row_map:
+            shard_overrides['DOMAIN_ROW_MAP'] = shard_path(row_map, index)
+        process = multiprocessing.Process(
+            target=_crawl_shard,
+            args=(index, shards, queue, domains, input_path, profile, shard_overrides, spider_cls, pause_event),
+            name=f'crawler-shard-{index}',
+        )
+        process.start()
+        processes[index] = process
+    logger.info(f"Started {shards} crawler shards")
+
+    shard_stats = {}
+    failed = set()
+    items = 0
+    last_progress = time.monotonic()
+    while len(shard_stats) + len(failed) < shards:
+        try:
+            message = queue.get(timeout=1)
+        except Empty:
+            # Nothing left on the queue from a shard that has exited: it died
+            for index, process in processes.items():
+                if index not in shard_stats and index not in failed and process.exitcode is not None:
+                    logger.error(f"Crawler shard {index} exited with code {process.exitcode} before finishing")
+                    failed.add(index)
+            continue
+        if message[0] == 'items':
+            for entry in message[1]:
+                if isinstance(entry, DomainEvent):
+                    if event_callback is not None:
+                        event_callback(entry)
+                    continue
+                items += 1
+                if item_callback is not None:
+                    item_callback(entry)
+        else:
+            _, index, stats = message
+            shard_stats[index] = stats
+            logger.info(f"Crawler shard {index} finished ({stats.get('finish_reason')}): "
+                        f"{stats.get('response_received_count', 0)} pages, {stats.get('item_scraped_count', 0)} items")
+        if time.monotonic() - last_progress >= PROGRESS_INTERVAL:
+            last_progress = time.monotonic()
+            logger.info(f"{items} items so far, {len(shard_stats) + len(failed)} of {shards} shards done")
+
+    for process in processes.values():
+        process.join()
+    if row_map:
+        merge_row_maps([shard_path(row_map, index) for index in range(shards)], row_map)
+
+    stats = merge_stats(shard_stats[index] for index in sorted(shard_stats))
+    stats['shards'] = shards
+    if failed:
+        stats['shards/failed'] = len(failed)
+        stats['finish_reason'] = 'shard_failed'
+    if closed_callback is not None:
+        closed_callback()
+    return stats
+
+
+def run_spider(domains, item_queue, spider_closed_event, pause_event, input_path=None, profile=None, shards=None):
+    """
+    Target of the GUIs' crawler process: scraped items (dicts) and domain
+    events are put on item_queue in batches (see transport.receive_batches
+    and progress.split_batch), then END, and spider_closed_event is set
+    when the crawl is over. Setting pause_event pauses the crawl (see
+    extensions.PauseController). shards defaults to the CRAWL_SHARDS setting.
+    """
+    settings = project_settings(profile)
+    if shards is None:
+        shards = settings.getint('CRAWL_SHARDS', 1)
+    sender = _batch_sender(item_queue.put, settings)
+
+    def closed():
+        sender.close()
+        item_queue.put(END)
+        spider_closed_event.set()
+
+    kwargs = dict(
+        profile=profile,
+        item_callback=lambda item: sender.add(dict(item)),
+        event_callback=sender.add,
+        closed_callback=closed,
+        pause_event=pause_event,
+    )
+    try:
+        if shards == 1:
+            crawl(domains, input_path, **kwargs)
+        else:
+            crawl_sharded(domains, input_path, shards=shards or None, **kwargs)
+    finally:
+        sender.close()
@@ -0,0 +1,96 @@
+# Bounded scanner for phone numbers inside <script> tags.
+#
+# The script stage used to serialize every <script> with getall() and run
+# every pattern over each full string, multi-megabyte JS bundles included.
+# ScriptScanner reads script text straight from the lxml tree and:
+#   - scans JSON-LD / JSON data islands and inline config scripts
+#     (window.__STATE__ = ..., var config = {...}) first, where business
+#     phone numbers usually live, then the remaining inline scripts; the
+#     smaller script goes first within each group
+#   - skips external scripts and anything that looks like a library bundle
+#   - scans in fixed-size windows under a per-script and a per-page budget,
+#     so a caller that stops iterating stops the scan immediately
+
+import re
+from collections import Counter
+
+
+# Markers found at the start or end of minified library / webpack bundles
+BUNDLE_MARKERS = ('/*!', 'webpackJsonp', '__webpack_require__', 'sourceMappingURL=', '!function(e,t)', '(function(e,t)')
+
+# Config assignment near the start of a script: window.__STATE__ = ...,
+# or an object literal assigned to a variable or property
+CONFIG_PATTERN = re.compile(r'window\.__\w+\s*=|^\s*(?:(?:var|let|const)\s+)?[\w$.]+\s*=\s*\{', re.MULTILINE)
+
+# Overlap between windows; longer than the longest phone pattern match
+WINDOW_OVERLAP = 32
+
+
+class ScriptScanner:
+
+    def __init__(self, matcher, script_budget=128 * 1024, page_budget=512 * 1024,
+                 bundle_length=256 * 1024, window_size=16 * 1024):
+        self.matcher = matcher
+        self.script_budget = script_budget
+        self.page_budget = page_budget
+        self.bundle_length = bundle_length
+        self.window_size = window_size
+        self.counts = Counter()
+
+    def is_bundle(self, text):
+        if len(text) >= self.bundle_length:
+            return True
+        head = text[:512]
+        tail = text[-256:]
+        return any(marker in head or marker in tail for marker in BUNDLE_MARKERS)
+
+    def is_priority(self, script, text):
+        """JSON-LD, JSON data islands and inline scripts that look like config."""
+        script_type = (script.get('type') or '').lower()
+        if 'json' in script_type:
+            return True
+        return CONFIG_PATTERN.search(text[:512]) is not None
+
+    def ordered_scripts(self, root):
+        """Inline scripts worth scanning, priority scripts first, then by size."""
+        priority, remaining = [], []
+        for script in root.iter('script'):
+            if script.get('src'):
+                self.counts['external'] += 1
+                continue
+            text = script.text
+            if not text or not text.strip():
+                continue
+            if self.is_bundle(text):
+                self.counts['bundle_skipped'] += 1
+                continue
+            if self.is_priority(script, text):
+                priority.append(text)
+            else:
+                remaining.append(text)
+        return sorted(priority, key=len) + sorted(remaining, key=len)
+
+    def scan(self, root):
+        """Yield candidate numbers found in the scripts of root, within the budgets."""
+        page_left = self.page_budget
+        for text in self.ordered_scripts(root):
+            if page_left <= 0:
+                self.counts['page_budget_exhausted'] += 1
+                return
+            budget = min(len(text), self.script_budget, page_left)
+            if budget < len(text):
+                self.counts['truncated'] += 1
+            page_left -= budget
+            self.counts['scanned'] += 1
+            for start in range(0, budget, self.window_size):
+                end = min(start + self.window_size, budget)
+                window = text[start:min(end + WINDOW_OVERLAP, budget)]
+                last_window = end >= budget
+                for _, match_start, number in self.matcher.matches(window):
+                    # Matches starting inside the overlap are reported by the next window
+                    if last_window or match_start < end - start:
+                        yield number
+
+    def record_stats(self, stats, prefix='script_scanner'):
+        for key, count in self.counts.items():
+            stats.set_value(f'{prefix}/{key}', count)
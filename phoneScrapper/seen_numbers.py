@@ -0,0 +1,64 @@
+# Per-page set of phone numbers already extracted, shared by every stage.
+#
+# Besides exact membership it answers "is this number a substring or a
+# superstring of one already seen" without comparing against every stored
+# number: all substrings of each added number are indexed in a hash set, so
+# both directions cost O(L^2) set lookups in the number's length (10-15
+# digits) no matter how many numbers the page has.
+
+import re
+
+
+NON_DIGIT_RE = re.compile(r'\D')
+
+
+class SeenNumbers:
+
+    def __init__(self, numbers=()):
+        self._numbers = set()
+        self._substrings = set()
+        self._min_length = 0
+        for number in numbers:
+            self.add(number)
+
+    @staticmethod
+    def normalize(number):
+        return NON_DIGIT_RE.sub('', number) if number else ''
+
+    def add(self, number):
+        number = self.normalize(number)
+        if not number or number in self._numbers:
+            return
+        self._numbers.add(number)
+        length = len(number)
+        if not self._min_length or length < self._min_length:
+            self._min_length = length
+        self._substrings.update(
+            number[start:end] for start in range(length) for end in range(start + 1, length + 1)
+        )
+
+    def __contains__(self, number):
+        return self.normalize(number) in self._numbers
+
+    def __len__(self):
+        return len(self._numbers)
+
+    def __iter__(self):
+        return iter(self._numbers)
+
+    def overlaps(self, number):
+        """True if number is part of, equal to or extends a number already seen."""
+        number = self.normalize(number)
+        if not number or not self._numbers:
+            return False
+        if number in self._substrings:
+            return True
+        # Only substrings at least as long as the shortest seen number can match
+        length = len(number)
+        min_length = self._min_length
+        numbers = self._numbers
+        return any(
+            number[start:end] in numbers
+            for start in range(length - min_length + 1)
+            for end in range(start + min_length, length + 1)
+        )
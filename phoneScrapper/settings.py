@@ -19,52 +19,54 @@ NEWSPIDER_MODULE = "phoneScrapper.spiders"
 # Obey robots.txt rules
 ROBOTSTXT_OBEY = True
 
+# The defaults below are the "polite" profile; phoneScrapper/profiles.py has
+# the others ("broad", "single-lookup"), selected with SETTINGS_PROFILE or
+# run_spider(..., profile=...)
+SETTINGS_PROFILE = None
+
 # Configure maximum concurrent requests performed by Scrapy (default: 16)
-#CONCURRENT_REQUESTS = 32
+CONCURRENT_REQUESTS = 8
+CONCURRENT_REQUESTS_PER_DOMAIN = 2
+# CONCURRENT_REQUESTS_PER_IP = 2
 
 # Configure a delay for requests for the same website (default: 0)
 # See https://docs.scrapy.org/en/latest/topics/settings.html#download-delay
 # See also autothrottle settings and docs
-# settings.py
-# settings.py
-
-# Enable AutoThrottle
-AUTOTHROTTLE_ENABLED = True
-AUTOTHROTTLE_START_DELAY = 5
-AUTOTHROTTLE_MAX_DELAY = 60
-AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
-AUTOTHROTTLE_DEBUG = False
+DOWNLOAD_DELAY = 1
 
-# Configure a delay for requests for the same website
-DOWNLOAD_DELAY = 5
-
-# The maximum number of concurrent requests that will be performed by the Scrapy downloader
-CONCURRENT_REQUESTS = 8
-CONCURRENT_REQUESTS_PER_DOMAIN = 2
+# Threads for DNS lookups (default: 10) and hosts kept in the DNS cache
+REACTOR_THREADPOOL_MAXSIZE = 10
+DNSCACHE_SIZE = 10000
 
 # Enable and configure the AutoThrottle extension
+# See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 AUTOTHROTTLE_ENABLED = True
+# The initial download delay
 AUTOTHROTTLE_START_DELAY = 5
+# The maximum download delay to be set in case of high latencies
 AUTOTHROTTLE_MAX_DELAY = 60
+# The average number of requests Scrapy should be sending in parallel to
+# each remote server
 AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
+# Enable showing throttling stats for every response received:
 AUTOTHROTTLE_DEBUG = False
 
-# Enable the Retry Middleware
+# Retry settings
 RETRY_ENABLED = True
-RETRY_TIMES = 3  # Number of retries for a request
+RETRY_TIMES = 3  # Retry 3 times before giving up
+RETRY_HTTP_CODES = [500, 502, 503, 504, 408, 403, 404]  # Retry on these HTTP codes
 
-# Set the timeout for requests
-DOWNLOAD_TIMEOUT = 15  # Timeout in seconds
+# The download timeout in seconds
+DOWNLOAD_TIMEOUT = 15
 
 # HTTP Cache
+# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
 HTTPCACHE_ENABLED = True
 HTTPCACHE_EXPIRATION_SECS = 0
 HTTPCACHE_DIR = 'httpcache'
 HTTPCACHE_IGNORE_HTTP_CODES = []
 HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 
-# Your spider code here
-
 # CONCURRENT_REQUESTS_PER_IP = 2
 
 # Disable cookies (enabled by default)
@@ -89,15 +91,17 @@ HTTPCACHE_STORAGE = 'scrapy.extensions.httpcache.FilesystemCacheStorage'
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
 # Rotate user agents
 DOWNLOADER_MIDDLEWARES = {
+    'phoneScrapper.middlewares.SatisfiedParentMiddleware': 50,
     'scrapy.downloadermiddlewares.useragent.UserAgentMiddleware': None,
     'scrapy_user_agents.middlewares.RandomUserAgentMiddleware': 400,
 }
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+# Pause/resume the engine from the GUI's pause_event without blocking the reactor
+EXTENSIONS = {
+    "phoneScrapper.extensions.PauseController": 500,
+}
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
@@ -105,27 +109,6 @@ DOWNLOADER_MIDDLEWARES = {
 #    "phoneScrapper.pipelines.PhonescrapperPipeline": 300,
 #}
 
-# Enable and configure the AutoThrottle extension (disabled by default)
-# See https://docs.scrapy.org/en/latest/topics/autothrottle.html
-#AUTOTHROTTLE_ENABLED = True
-# The initial download delay
-#AUTOTHROTTLE_START_DELAY = 5
-# The maximum download delay to be set in case of high latencies
-#AUTOTHROTTLE_MAX_DELAY = 60
-# The average number of requests Scrapy should be sending in parallel to
-# each remote server
-#AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
-# Enable showing throttling stats for every response received:
-#AUTOTHROTTLE_DEBUG = False
-
-# Enable and configure HTTP caching (disabled by default)
-# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-#HTTPCACHE_ENABLED = True
-#HTTPCACHE_EXPIRATION_SECS = 0
-#HTTPCACHE_DIR = "httpcache"
-#HTTPCACHE_IGNORE_HTTP_CODES = []
-#HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
-
 # Set settings whose default value is deprecated to a future-proof value
 REQUEST_FINGERPRINTER_IMPLEMENTATION = "2.7"
 TWISTED_REACTOR = "twisted.internet.asyncioreactor.AsyncioSelectorReactor"
@@ -143,26 +126,50 @@ FEEDS = {
         'encoding': 'utf8',
         'store_empty': False,
         'overwrite': True,
+        # One row per domain, not the numbers found along the way (see results.py)
+        'item_filter': 'phoneScrapper.results.FinalRecordFilter',
     },
 }
 
-# Set the logging level
-LOG_LEVEL = 'DEBUG'
+# Entries kept by the spider's phone number -> country LRU cache
+COUNTRY_CACHE_SIZE = 50000
 
-# Configure a delay for requests for the same website (default: 0)
-DOWNLOAD_DELAY = 1
+# Characters of inline <script> text scanned for numbers, per script and per page
+SCRIPT_SCAN_BUDGET = 131072
+SCRIPT_SCAN_PAGE_BUDGET = 524288
 
-# The download timeout in seconds
-DOWNLOAD_TIMEOUT = 15
+# Follow-up links (contact, about, ...) requested per parent URL at most
+MAX_FOLLOWS_PER_PARENT = 6
 
-# Retry settings
-RETRY_ENABLED = True
-RETRY_TIMES = 3  # Retry 3 times before giving up
-RETRY_HTTP_CODES = [500, 502, 503, 504, 408, 403, 404]  # Retry on these HTTP codes
+# CSV file with, per input row, its canonical domain, parent URL and whether
+# it was crawled, a duplicate or rejected (None to disable). The command line
+# writes it next to its --output file.
+DOMAIN_ROW_MAP = None
 
-# Enable and configure the AutoThrottle extension (disabled by default)
-AUTOTHROTTLE_ENABLED = True
-AUTOTHROTTLE_START_DELAY = 5
-AUTOTHROTTLE_MAX_DELAY = 60
-AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
-AUTOTHROTTLE_DEBUG = False
\ No newline at end of file
+# Distinct domains kept in memory for deduping before moving to a temporary SQLite file
+DOMAIN_DEDUPE_MEMORY = 1000000
+
+# Resolve all input domains before crawling and skip the ones that don't exist
+DNS_PREPASS_ENABLED = False
+DNS_PREPASS_CONCURRENCY = 100
+DNS_PREPASS_TIMEOUT = 5
+DNS_PREPASS_RESOLVER = 'phoneScrapper.dns_prepass.SystemResolver'
+# Persistent cache of the answers; non-existent hosts are remembered longer
+DNS_CACHE_FILE = 'dns_cache.sqlite'
+DNS_POSITIVE_TTL = 3600
+DNS_NEGATIVE_TTL = 86400
+
+# Crawler processes the domain list is split over (see runner.crawl_sharded),
+# 0 for one per CPU core; concurrency settings apply to each of them
+CRAWL_SHARDS = 1
+
+# Items sent from the crawler process to the GUI together: a batch goes out
+# once it has ITEM_BATCH_SIZE items, or at most ITEM_BATCH_INTERVAL seconds after its first one
+ITEM_BATCH_SIZE = 200
+ITEM_BATCH_INTERVAL = 0.1
+
+# Seconds between checks of the pause_event by the PauseController extension
+PAUSE_POLL_INTERVAL = 0.25
+
+# Set the logging level
+LOG_LEVEL = 'DEBUG'
@@ -0,0 +1,184 @@
+# Single-pass text extraction over the lxml tree of a response.
+#
+# The spiders used to run a 21-way XPath union and call string() on every
+# match, so text inside nested divs/sections was serialized once per ancestor.
+# PageText walks the tree once, visits every text node exactly once and keeps
+# the element context (tag, class, id, style and the parent chain) each chunk
+# was found in. The index is built lazily per response and shared by the zip
+# and phone extraction stages for the life of the callback.
+
+import weakref
+
+from lxml import etree
+
+
+# Elements whose text starts a new block. Text inside inline elements (span,
+# strong, a, ...) is merged into the nearest enclosing block so numbers split
+# across inline markup, e.g. <span>(877)</span> 959-2505, still match.
+BLOCK_TAGS = frozenset([
+    'body', 'p', 'div', 'li', 'ul', 'ol', 'dl', 'dt', 'dd', 'footer', 'section',
+    'header', 'aside', 'blockquote', 'address', 'nav', 'article', 'main',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'table', 'tr', 'td', 'th', 'form',
+    'figure', 'figcaption',
+])
+
+# Elements whose content is never visible page text
+SKIP_TAGS = frozenset(['head', 'script', 'style', 'noscript', 'template', 'svg'])
+
+
+class NodeContext:
+    """Element a text chunk was found in, linked to its parent context."""
+    __slots__ = ('element', 'parent')
+
+    def __init__(self, element, parent=None):
+        self.element = element
+        self.parent = parent
+
+    @property
+    def tag(self):
+        return self.element.tag
+
+    def get(self, attr, default=None):
+        return self.element.get(attr, default)
+
+    @property
+    def cls(self):
+        return self.element.get('class', '')
+
+    @property
+    def id(self):
+        return self.element.get('id', '')
+
+    @property
+    def style(self):
+        return self.element.get('style', '')
+
+
+class TextChunk:
+    __slots__ = ('text', 'context')
+
+    def __init__(self, text, context):
+        self.text = text
+        self.context = context
+
+
+class TextBlock:
+    """Text of one block element, excluding the text of nested blocks."""
+    __slots__ = ('context', 'chunks', '_text')
+
+    def __init__(self, context):
+        self.context = context
+        self.chunks = []
+        self._text = None
+
+    @property
+    def text(self):
+        if self._text is None:
+            self._text = ''.join(chunk.text for chunk in self.chunks)
+        return self._text
+
+
+class ElementText:
+    """Full string() of an element plus the text nodes directly inside it."""
+    __slots__ = ('context', 'parts', 'own_parts')
+
+    def __init__(self, context):
+        self.context = context
+        self.parts = []
+        self.own_parts = []
+
+    @property
+    def text(self):
+        return ''.join(self.parts)
+
+    @property
+    def own_text(self):
+        return ''.join(self.own_parts)
+
+
+# PageText of every response currently being parsed
+_page_texts = weakref.WeakKeyDictionary()
+
+
+class PageText:
+    """Text nodes of a parsed page, collected in one walk of the tree."""
+
+    def __init__(self, root):
+        self.chunks = []
+        self.blocks = []
+        self.spans = []
+        self.tel_links = []
+        if root is not None:
+            self._walk(root)
+
+    @classmethod
+    def for_response(cls, response):
+        """Return the index of response, walking its DOM on first use only."""
+        page_text = _page_texts.get(response)
+        if page_text is None:
+            page_text = _page_texts[response] = cls(response.selector.root)
+        return page_text
+
+    @property
+    def tel_hrefs(self):
+        return [link.context.get('href') for link in self.tel_links]
+
+    def _walk(self, root):
+        chunks = self.chunks
+        stack = []         # NodeContext of every open element
+        block_stack = []   # open TextBlocks
+        capture_stack = [] # open spans and tel: links; their string() needs nested text too
+
+        def add_text(text, context):
+            chunk = TextChunk(text, context)
+            chunks.append(chunk)
+            if block_stack:
+                block_stack[-1].chunks.append(chunk)
+            for captured in capture_stack:
+                captured.parts.append(text)
+            if capture_stack and capture_stack[-1].context is context:
+                capture_stack[-1].own_parts.append(text)
+
+        walker = etree.iterwalk(root, events=('start', 'end', 'comment', 'pi'))
+        for event, element in walker:
+            tag = element.tag
+            if event == 'start':
+                if not isinstance(tag, str):
+                    continue
+                context = NodeContext(element, stack[-1] if stack else None)
+                stack.append(context)
+                if tag in SKIP_TAGS:
+                    walker.skip_subtree()
+                    continue
+                if tag in BLOCK_TAGS:
+                    block = TextBlock(context)
+                    self.blocks.append(block)
+                    block_stack.append(block)
+                elif tag == 'span':
+                    span = ElementText(context)
+                    self.spans.append(span)
+                    capture_stack.append(span)
+                elif tag == 'a':
+                    href = element.get('href')
+                    if href and href.startswith('tel:'):
+                        link = ElementText(context)
+                        self.tel_links.append(link)
+                        capture_stack.append(link)
+                if element.text:
+                    add_text(element.text, context)
+            elif event == 'end':
+                if not isinstance(tag, str):
+                    continue
+                context = stack.pop()
+                if tag not in SKIP_TAGS:
+                    if tag in BLOCK_TAGS:
+                        block_stack.pop()
+                    elif capture_stack and capture_stack[-1].context is context:
+                        capture_stack.pop()
+                if element.tail and stack:
+                    add_text(element.tail, stack[-1])
+            elif element.tail and stack:
+                # Comments and processing instructions only contribute a tail
+                add_text(element.tail, stack[-1])
+
+        self.blocks = [block for block in self.blocks if block.chunks]
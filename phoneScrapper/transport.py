@@ -0,0 +1,82 @@
+# Moving scraped items from the crawler process to the GUI process.
+#
+# Items used to be put on the multiprocessing queue one by one, and the
+# GUI's ScrapingThread spun on item_queue.empty() without ever blocking,
+# using a whole core for the length of the crawl. Now the crawler side
+# sends lists of items (a BatchSender flushes every ITEM_BATCH_SIZE items or
+# ITEM_BATCH_INTERVAL seconds, whichever comes first) followed by END, and
+# the receiving side blocks on the queue with a timeout (receive_batches).
+# Shard processes use the same batching to send items to the process that
+# merges them (see runner.crawl_sharded).
+
+import threading
+from queue import Empty
+
+
+# Put on the queue after the last batch
+END = None
+
+
+class BatchSender:
+    """
+    Collects items and passes them to send(batch) as lists, once batch_size
+    items are waiting or at the latest interval seconds after they came in.
+    Batches are sent in order; close() sends what is left.
+    """
+
+    def __init__(self, send, batch_size=200, interval=0.1):
+        self.send = send
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch = []
+        self.batches = 0
+        # Held while sending too, so the flush thread can't overtake a full batch
+        self.lock = threading.Lock()
+        self.closed = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='item-batch-sender', daemon=True)
+        self.thread.start()
+
+    def add(self, item):
+        with self.lock:
+            self.batch.append(item)
+            if len(self.batch) >= self.batch_size:
+                self._send()
+
+    def flush(self):
+        with self.lock:
+            if self.batch:
+                self._send()
+
+    def _send(self):
+        batch, self.batch = self.batch, []
+        self.batches += 1
+        self.send(batch)
+
+    def _run(self):
+        while not self.closed.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        if self.closed.is_set():
+            return
+        self.closed.set()
+        self.thread.join()
+        self.flush()
+
+
+def receive_batches(queue, alive, timeout=0.25):
+    """
+    Yield the batches put on queue until END, or until alive() is false
+    and nothing more arrives (the sending process died). Blocks on the
+    queue, waking up every timeout seconds only to call alive().
+    """
+    while True:
+        try:
+            batch = queue.get(timeout=timeout)
+        except Empty:
+            if not alive():
+                return
+            continue
+        if batch is END:
+            return
+        yield batch
@@ -0,0 +1,87 @@
+# Candidate phone number validation shared by both spider variants.
+#
+# Every rule is compiled once at import. A spider picks the rules it applies
+# by name, in order; the first rule that fails rejects the candidate and is
+# counted in PhoneValidator.rejections so the crawl stats show why numbers
+# were dropped.
+
+import re
+import time
+from collections import Counter
+
+
+NON_DIGIT_RE = re.compile(r'\D')
+REPEATED_DIGITS_RE = re.compile(r'(\d)\1{6,}')
+ID_FORMAT_RE = re.compile(r'[-_]?\d{4}[-_]\d{4}')
+LETTER_RE = re.compile(r'[a-zA-Z]')
+ID_PATTERN_RE = re.compile(
+    r'shopify-\w+'
+    r'|template--\w+'
+    r'|section-\w+'
+    r'|ImageWithText-\w+'
+)
+
+# Digit-only candidates in this range are Unix timestamps (1980-01-01 onwards)
+TIMESTAMP_MIN = 315532800
+
+
+class PhoneValidator:
+
+    def __init__(self, rules, min_digits=10, max_digits=None):
+        self.min_digits = min_digits
+        self.max_digits = max_digits
+        self.rules = [(name, getattr(self, f'_reject_{name}')) for name in rules]
+        self.accepted = 0
+        self.rejections = Counter()
+
+    def reject_reason(self, phone_number):
+        """Return the name of the first rule rejecting phone_number, or None if it is valid."""
+        if not phone_number:
+            return 'empty'
+        digits = NON_DIGIT_RE.sub('', phone_number)
+        for name, rejects in self.rules:
+            if rejects(phone_number, digits):
+                return name
+        return None
+
+    def is_valid(self, phone_number):
+        reason = self.reject_reason(phone_number)
+        if reason is None:
+            self.accepted += 1
+            return True
+        self.rejections[reason] += 1
+        return False
+
+    def _reject_length(self, phone_number, digits):
+        if len(digits) < self.min_digits:
+            return True
+        return self.max_digits is not None and len(digits) > self.max_digits
+
+    def _reject_repeated_digits(self, phone_number, digits):
+        return REPEATED_DIGITS_RE.match(digits) is not None
+
+    def _reject_suspicious_sequence(self, phone_number, digits):
+        return "168" in digits
+
+    def _reject_id_format(self, phone_number, digits):
+        return ID_FORMAT_RE.search(phone_number) is not None
+
+    def _reject_id_pattern(self, phone_number, digits):
+        return ID_PATTERN_RE.search(phone_number) is not None
+
+    def _reject_reserved_prefix(self, phone_number, digits):
+        return digits.startswith("1790")
+
+    def _reject_timestamp(self, phone_number, digits):
+        if not phone_number.isdigit():
+            return False
+        # Up to now: a spider outlives the moment it was created
+        return TIMESTAMP_MIN <= int(phone_number) <= time.time()
+
+    def _reject_letters(self, phone_number, digits):
+        return LETTER_RE.search(phone_number) is not None
+
+    def record_stats(self, stats, prefix='phone_validator'):
+        stats.set_value(f'{prefix}/accepted', self.accepted)
+        for reason, count in self.rejections.items():
+            stats.set_value(f'{prefix}/rejected/{reason}', count)
@@ -0,0 +1,204 @@
+# Compact ZIP / postal code -> country index.
+#
+# dataset/Country_zip.csv used to be loaded with pandas into a dict by every
+# spider instance. The index is now built once into a binary file that is
+# memory-mapped read-only on first lookup, so crawler processes share the
+# same pages instead of each holding its own dict.
+#
+#   python -m phoneScrapper.zip_index dataset/Country_zip.csv [dataset/Country_zip.zipidx]
+#
+# File layout (little-endian):
+#   header    magic, country count, Canadian record count, names blob size
+#   names     country names, UTF-8, separated by '\n'
+#   US table  100000 x uint16: country number + 1 for every 5-digit ZIP (0 = unknown)
+#   CA table  sorted records of 6-byte postal code (space padded) + uint16 country number
+
+import csv
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+import threading
+
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'ZIPIDX1\0'
+HEADER = struct.Struct('<8sHII')
+US_SLOTS = 100000
+CA_RECORD = struct.Struct('<6sH')
+INDEX_SUFFIX = '.zipidx'
+
+CA_CODE_RE = re.compile(r'^[A-Z]\d[A-Z](?:\d[A-Z]\d)?$')
+
+
+def normalize_zip(zip_code):
+    """
+    Return ('US', 5-digit ZIP) or ('CA', postal code without space) for a
+    ZIP/postal code as found in the CSV or extracted from a page, or None.
+    """
+    zip_code = str(zip_code).strip().upper()
+    if zip_code.endswith('.0'):
+        # Integer column read back as float
+        zip_code = zip_code[:-2]
+    us_zip = zip_code.split('-', 1)[0]
+    if us_zip.isdigit() and len(us_zip) <= 5:
+        # Integer Zip values lost their leading zeros
+        return 'US', us_zip.zfill(5)
+    ca_code = zip_code.replace(' ', '')
+    if CA_CODE_RE.match(ca_code):
+        return 'CA', ca_code
+    return None
+
+
+def build_index(csv_path, index_path):
+    """Build the binary index at index_path from a CSV with Zip and Country columns."""
+    countries = []
+    country_numbers = {}
+    us_table = [0] * US_SLOTS
+    ca_table = {}
+
+    with open(csv_path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            normalized = normalize_zip(row.get('Zip', ''))
+            country = (row.get('Country') or '').strip()
+            if normalized is None or not country:
+                continue
+            if country not in country_numbers:
+                country_numbers[country] = len(countries)
+                countries.append(country)
+            kind, key = normalized
+            if kind == 'US':
+                us_table[int(key)] = country_numbers[country] + 1
+            else:
+                ca_table[key] = country_numbers[country]
+
+    names = '\n'.join(countries).encode('utf-8')
+    ca_records = sorted(ca_table.items())
+    data = bytearray(HEADER.pack(MAGIC, len(countries), len(ca_records), len(names)))
+    data += names
+    data += struct.pack(f'<{US_SLOTS}H', *us_table)
+    for key, number in ca_records:
+        data += CA_RECORD.pack(key.ljust(6).encode('ascii'), number)
+
+    # Write next to the target and rename, so concurrent workers never map a partial file
+    directory = os.path.dirname(os.path.abspath(index_path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=INDEX_SUFFIX)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.chmod(tmp_path, 0o644)
+    os.replace(tmp_path, index_path)
+    return len(countries), sum(1 for number in us_table if number), len(ca_records)
+
+
+class ZipIndex:
+    """Read-only mapping of ZIP/postal code -> country backed by the binary index."""
+
+    # One mapped index per file for the whole process
+    _instances = {}
+    _lock = threading.Lock()
+
+    def __init__(self, source_path):
+        self.source_path = source_path
+        self._data = None
+
+    @classmethod
+    def for_source(cls, source_path):
+        """Index for a .zipidx file or for a CSV (compiled next to it on first use)."""
+        with cls._lock:
+            if source_path not in cls._instances:
+                cls._instances[source_path] = cls(source_path)
+            return cls._instances[source_path]
+
+    def get(self, zip_code, default=None):
+        if self._data is None:
+            self._load()
+        normalized = normalize_zip(zip_code)
+        if normalized is None or not self._data:
+            return default
+        kind, key = normalized
+        if kind == 'US':
+            number, = struct.unpack_from('<H', self._data, self._us_offset + 2 * int(key))
+            return self._countries[number - 1] if number else default
+        # Full postal code first, then its forward sortation area
+        for candidate in (key, key[:3]):
+            number = self._find_ca(candidate.ljust(6).encode('ascii'))
+            if number is not None:
+                return self._countries[number]
+        return default
+
+    def __contains__(self, zip_code):
+        return self.get(zip_code) is not None
+
+    def __getitem__(self, zip_code):
+        country = self.get(zip_code)
+        if country is None:
+            raise KeyError(zip_code)
+        return country
+
+    def _find_ca(self, key):
+        low, high = 0, self._ca_count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._ca_offset + middle * CA_RECORD.size
+            record_key = self._data[offset:offset + 6]
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                return CA_RECORD.unpack_from(self._data, offset)[1]
+        return None
+
+    def _load(self):
+        with self._lock:
+            if self._data is not None:
+                return
+            try:
+                self._data = self._map(self._index_path())
+                magic, country_count, self._ca_count, names_size = HEADER.unpack_from(self._data)
+            except (OSError, ValueError, struct.error) as e:
+                logger.error(f"Could not load ZIP index for {self.source_path}: {e}")
+                self._data = b''
+                return
+            if magic != MAGIC:
+                logger.error(f"{self.source_path} is not a ZIP index")
+                self._data = b''
+                return
+            names_end = HEADER.size + names_size
+            names = bytes(self._data[HEADER.size:names_end]).decode('utf-8')
+            self._countries = names.split('\n') if country_count else []
+            self._us_offset = names_end
+            self._ca_offset = names_end + 2 * US_SLOTS
+
+    def _index_path(self):
+        if not self.source_path.lower().endswith('.csv'):
+            return self.source_path
+        index_path = os.path.splitext(self.source_path)[0] + INDEX_SUFFIX
+        if (not os.path.exists(index_path)
+                or os.path.getmtime(index_path) < os.path.getmtime(self.source_path)):
+            logger.info(f"Building ZIP index {index_path} from {self.source_path}")
+            build_index(self.source_path, index_path)
+        return index_path
+
+    @staticmethod
+    def _map(index_path):
+        with open(index_path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not 1 <= len(argv) <= 2:
+        sys.exit("Usage: python -m phoneScrapper.zip_index CSV_PATH [INDEX_PATH]")
+    csv_path = argv[0]
+    index_path = argv[1] if len(argv) == 2 else os.path.splitext(csv_path)[0] + INDEX_SUFFIX
+    countries, us_count, ca_count = build_index(csv_path, index_path)
+    print(f"Wrote {index_path}: {us_count} US ZIPs, {ca_count} Canadian codes, {countries} countries")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+# Results table of the GUIs (app.py, app3.py).
+#
+# The table used to be a QTableWidget: one QTableWidgetItem and one QColor
+# per cell, rows inserted one at a time and, in app3.py, a scan of every row
+# to find a URL again. Past ~50k rows the GUI stalled. The data now lives in
+# a ResultStore, one list per column plus a URL -> row dict, and
+# ResultsTableModel shows it in a QTableView: the view only asks for the
+# cells it paints, rows are inserted a batch at a time, and alternating row
+# colours are painted by the view.
+
+import sys
+
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from phoneScrapper.results import is_final
+
+
+HEADERS = ["Sl.", "🌐 Website", "Phone Number 1️⃣", "🗺️ Country", "Phone Number 2️⃣", "🗺️ Country", "Phone Number 3️⃣", "🗺️ Country"]
+
+# Column names when saving, the serial number first
+EXPORT_COLUMNS = ["Sl", "Website", "Phone Number 1", "Country 1", "Phone Number 2", "Country 2", "Phone Number 3", "Country 3"]
+
+
+class ResultStore:
+    """
+    Rows of (url, number 1, country 1, number 2, country 2, number 3,
+    country 3) kept column by column. Countries repeat a lot and are interned.
+    """
+
+    COLUMNS = 7
+    COUNTRY_COLUMNS = (2, 4, 6)
+
+    def __init__(self):
+        self.columns = [[] for _ in range(self.COLUMNS)]
+        self.index = {}
+
+    def __len__(self):
+        return len(self.columns[0])
+
+    def _values(self, values):
+        values = [value or '' for value in values]
+        for column in self.COUNTRY_COLUMNS:
+            values[column] = sys.intern(values[column])
+        return values
+
+    def append(self, values):
+        row = len(self)
+        for column, value in zip(self.columns, self._values(values)):
+            column.append(value)
+        self.index.setdefault(values[0], row)
+        return row
+
+    def update(self, row, values):
+        for column, value in zip(self.columns, self._values(values)):
+            column[row] = value
+
+    def find(self, url):
+        """Row of the first result for url, or None."""
+        return self.index.get(url)
+
+    def row(self, row):
+        return [column[row] for column in self.columns]
+
+    def rows(self):
+        """Every row with its serial number first, for saving."""
+        for row, values in enumerate(zip(*self.columns)):
+            yield [str(row + 1), *values]
+
+    def clear(self):
+        self.columns = [[] for _ in range(self.COLUMNS)]
+        self.index = {}
+
+
+class ResultsTableModel(QAbstractTableModel):
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.store = ResultStore()
+        # Rows the views know of; rows appended or updated after that are shown by publish()
+        self.shown = 0
+        self.changed = None
+        # url -> fields of the delta records of a parent that isn't done yet
+        self.partial = {}
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.shown
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole or not index.isValid():
+            return None
+        if index.column() == 0:
+            return str(index.row() + 1)
+        return self.store.columns[index.column() - 1][index.row()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return None
+
+    def append_rows(self, rows):
+        """Append rows (lists of ResultStore.COLUMNS values); the views see them at the next publish()."""
+        for values in rows:
+            self.store.append(values)
+
+    def update_row(self, row, values):
+        self.store.update(row, values)
+        if row < self.shown:
+            first, last = self.changed or (row, row)
+            self.changed = (min(first, row), max(last, row))
+
+    def publish(self):
+        """
+        Tell the views about the rows appended and updated since the last
+        call, in one insertion and one change. Returns True if rows were added.
+        """
+        if self.changed:
+            (first, last), self.changed = self.changed, None
+            self.dataChanged.emit(self.index(first, 1), self.index(last, len(HEADERS) - 1))
+        if len(self.store) == self.shown:
+            return False
+        self.beginInsertRows(QModelIndex(), self.shown, len(self.store) - 1)
+        self.shown = len(self.store)
+        self.endInsertRows()
+        return True
+
+    def apply_records(self, records, values_for):
+        """
+        Upsert result records (see phoneScrapper/results.py) on their URL:
+        deltas are merged into the parent's fields until its final record
+        replaces them. values_for(fields) gives the row values of a parent's
+        fields (and may change them).
+        """
+        for record in records:
+            url = record['url']
+            if is_final(record):
+                self.partial.pop(url, None)
+                fields = dict(record)
+            else:
+                fields = self.partial.setdefault(url, {})
+                fields.update(record)
+                fields = dict(fields)
+            values = values_for(fields)
+            row = self.store.find(url)
+            if row is None:
+                self.append_rows([values])
+            else:
+                self.update_row(row, values)
+
+    def find(self, url):
+        return self.store.find(url)
+
+    def clear(self):
+        self.beginResetModel()
+        self.store.clear()
+        self.shown = 0
+        self.changed = None
+        self.partial = {}
+        self.endResetModel()
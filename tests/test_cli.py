@@ -0,0 +1,19 @@
+from phoneScrapper.cli import output_format, parse_args, row_map_path
+
+
+def test_row_map_is_written_next_to_the_output_file():
+    assert row_map_path('out/results.jsonl') == 'out/results.rows.csv'
+    assert row_map_path('results') == 'results.rows.csv'
+    # Not for results written to stdout
+    assert row_map_path('-') is None
+
+
+def test_output_format_from_the_file_name():
+    assert output_format('results.CSV') == 'csv'
+    assert output_format('-') == 'jsonlines'
+    assert output_format('results.csv', 'json') == 'json'
+
+
+def test_settings_given_on_the_command_line():
+    args = parse_args(['domains.txt', '-s', 'DOMAIN_ROW_MAP=rows.csv', '-s', 'LOG_LEVEL=INFO'])
+    assert dict(args.set) == {'DOMAIN_ROW_MAP': 'rows.csv', 'LOG_LEVEL': 'INFO'}
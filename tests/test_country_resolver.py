@@ -0,0 +1,32 @@
+import pytest
+from scrapy import signals
+from scrapy.utils.test import get_crawler
+
+from phoneScrapper.country_resolver import CountryResolver
+from phoneScrapper.spiders import phone_scrapper, phone_scrapy3
+
+
+def test_hits_and_misses_are_counted():
+    lookups = []
+    resolver = CountryResolver(lambda number: lookups.append(number) or 'US')
+    assert resolver.resolve('+1 (212) 555-0199') == 'US'
+    assert resolver.resolve('+1 212.555.0199') == 'US'
+    assert lookups == ['+1 (212) 555-0199']
+    assert (resolver.hits, resolver.misses) == (1, 1)
+
+
+def test_lru_drops_the_oldest_number():
+    resolver = CountryResolver(lambda number: 'US', maxsize=2)
+    for number in ('2125550101', '2125550102', '2125550101', '2125550103'):
+        resolver.resolve(number)
+    assert list(resolver._cache) == ['2125550101', '2125550103']
+
+
+@pytest.mark.parametrize('module', [phone_scrapper, phone_scrapy3])
+def test_spider_reports_to_the_crawler_stats(module):
+    crawler = get_crawler(module.PhoneScrapperSpider)
+    spider = crawler._create_spider()
+    crawler.signals.send_catch_log(signals.spider_opened, spider=spider)
+    assert spider.country_resolver.stats is crawler.stats
+    spider.country_resolver.resolve('+12125550199')
+    assert crawler.stats.get_value('country_resolver/miss') == 1
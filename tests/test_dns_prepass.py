@@ -0,0 +1,41 @@
+from scrapy.resolver import dnscache
+
+from phoneScrapper.dns_prepass import DnsCache, HostNotFound, StaticResolver, pre_resolve
+
+
+class NoDataResolver(StaticResolver):
+
+    async def resolve(self, host):
+        if host == 'nodata.test':
+            raise HostNotFound(host, 'nodata')
+        return await super().resolve(host)
+
+
+def make_cache(tmp_path):
+    return DnsCache(str(tmp_path / 'dns.sqlite'))
+
+
+def test_only_nxdomain_is_cached_dead(tmp_path):
+    cache = make_cache(tmp_path)
+    counts = pre_resolve(['dead.test', 'nodata.test'], cache, NoDataResolver({}))
+    assert counts == {'nxdomain': 1, 'nodata': 1}
+    assert cache.check('dead.test') == 'nxdomain'
+    assert cache.get('nodata.test') is None
+    assert cache.check('nodata.test') is None
+
+
+def test_www_variant_keeps_apex_alive(tmp_path):
+    cache = make_cache(tmp_path)
+    counts = pre_resolve(['apex.test'], cache, StaticResolver({'www.apex.test': '192.0.2.1'}))
+    assert counts == {'www_only': 1}
+    assert cache.check('apex.test') is None
+    assert 'apex.test' not in dnscache
+
+
+def test_only_ipv4_addresses_are_seeded(tmp_path):
+    cache = make_cache(tmp_path)
+    pre_resolve(['v4.test', 'v6.test'], cache, StaticResolver({'v4.test': '192.0.2.2', 'v6.test': ''}))
+    assert cache.check('v4.test') is None
+    assert cache.check('v6.test') is None
+    assert dnscache.get('v4.test') == '192.0.2.2'
+    assert 'v6.test' not in dnscache
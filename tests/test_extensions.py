@@ -0,0 +1,67 @@
+import threading
+from types import SimpleNamespace
+
+from scrapy.utils.test import get_crawler
+
+from phoneScrapper.extensions import PauseController
+
+
+class Engine:
+
+    def __init__(self):
+        self.paused = False
+        self.wakeups = 0
+        self.slot = SimpleNamespace(nextcall=SimpleNamespace(schedule=self.wake_up))
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+    def wake_up(self):
+        self.wakeups += 1
+
+
+def controller():
+    crawler = get_crawler(settings_dict={'PAUSE_POLL_INTERVAL': 60})
+    crawler.engine = Engine()
+    ext = PauseController.from_crawler(crawler)
+    ext.pause_event = threading.Event()
+    return ext, crawler
+
+
+def test_pause_then_resume():
+    ext, crawler = controller()
+    ext.poll()
+    assert not crawler.engine.paused
+
+    ext.pause_event.set()
+    ext.poll()
+    ext.poll()
+    assert crawler.engine.paused
+    assert crawler.stats.get_value('pause_controller/pauses') == 1
+
+    ext.pause_event.clear()
+    ext.poll()
+    assert not crawler.engine.paused
+    # The next request is picked up right away
+    assert crawler.engine.wakeups == 1
+    assert ext.paused_since is None
+    assert crawler.stats.get_value('pause_controller/paused_seconds') >= 0
+
+
+def test_pause_still_on_at_close_is_recorded():
+    ext, crawler = controller()
+    ext.pause_event.set()
+    ext.poll()
+    ext.spider_closed(None)
+    assert ext.paused_since is None
+    assert crawler.stats.get_value('pause_controller/paused_seconds') is not None
+
+
+def test_spiders_without_a_pause_event_are_not_polled():
+    ext, crawler = controller()
+    ext.spider_opened(SimpleNamespace())
+    assert ext.pause_event is None and ext.loop is None
+    ext.spider_closed(None)
@@ -0,0 +1,93 @@
+import pytest
+from OpenSSL import SSL
+from scrapy import Request
+from scrapy.utils.test import get_crawler
+from twisted.internet.error import ConnectionRefusedError, DNSLookupError, TimeoutError
+from twisted.python.failure import Failure
+from twisted.web._newclient import ResponseNeverReceived
+
+from phoneScrapper.fallback import FallbackChain, failure_reason
+
+
+def make_failure(error, request=None):
+    try:
+        raise error
+    except Exception:
+        failure = Failure()
+    failure.request = request
+    return failure
+
+
+def parent_request(url='https://example.com', **meta):
+    return Request(url, meta={'parent_url': 'https://example.com', 'is_parent': True, **meta})
+
+
+@pytest.mark.parametrize('error, reason', [
+    (DNSLookupError(), 'dns'),
+    (ConnectionRefusedError(), 'refused'),
+    (TimeoutError(), 'timeout'),
+    (SSL.Error(), 'tls'),
+    (ResponseNeverReceived([Failure(SSL.Error())]), 'tls'),
+    (ValueError(), None),
+])
+def test_failure_reason(error, reason):
+    assert failure_reason(make_failure(error)) == reason
+
+
+def test_variants_in_order():
+    assert FallbackChain.variants('https://www.example.com') == [
+        ('https', 'https://example.com'),
+        ('https_www', 'https://www.example.com'),
+        ('http', 'http://example.com'),
+        ('http_www', 'http://www.example.com'),
+    ]
+    assert [name for name, _ in FallbackChain.variants('https://127.0.0.1:8080')] == ['https', 'http']
+
+
+def chain_urls(chain, request, *errors):
+    """URLs tried after request fails with each of errors in turn."""
+    urls = []
+    for error in errors:
+        request = chain.next_request(make_failure(error, request))
+        if request is None:
+            break
+        urls.append(request.url)
+    return urls
+
+
+def test_refused_tries_the_other_scheme():
+    chain = FallbackChain()
+    assert chain_urls(chain, parent_request(), ConnectionRefusedError(), ConnectionRefusedError()) == ['http://example.com']
+
+
+def test_dns_skips_the_same_host():
+    chain = FallbackChain()
+    urls = chain_urls(chain, parent_request(), DNSLookupError(), ConnectionRefusedError(), ConnectionRefusedError())
+    assert urls == ['https://www.example.com', 'http://www.example.com']
+
+
+def test_tls_skips_the_https_variants():
+    chain = FallbackChain()
+    assert chain_urls(chain, parent_request(), SSL.Error(), DNSLookupError()) == ['http://example.com', 'http://www.example.com']
+
+
+def test_timeout_and_http_errors_stop_the_chain():
+    stats = get_crawler().stats
+    chain = FallbackChain(stats)
+    assert chain.next_request(make_failure(TimeoutError(), parent_request())) is None
+    assert chain.next_request(make_failure(ValueError(), parent_request())) is None
+    assert stats.get_value('fallback/stopped/timeout') == 1
+
+
+def test_followed_links_never_fall_back():
+    request = Request('https://example.com/contact', meta={'parent_url': 'https://example.com'})
+    assert FallbackChain().next_request(make_failure(DNSLookupError(), request)) is None
+
+
+def test_fallback_request_keeps_the_parent():
+    request = parent_request(retry_times=2)
+    fallback = FallbackChain(priority=50).next_request(make_failure(DNSLookupError(), request))
+    assert fallback.meta['parent_url'] == 'https://example.com'
+    assert fallback.meta['fallback_variant'] == 'https_www'
+    assert 'retry_times' not in fallback.meta
+    assert fallback.priority == 50 and fallback.dont_filter
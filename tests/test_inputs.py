@@ -0,0 +1,50 @@
+import gzip
+import re
+import zipfile
+
+from openpyxl import Workbook
+
+from phoneScrapper.inputs import count_domains, iter_input_rows, iter_rows
+
+
+def test_rows_are_stripped_and_blank_ones_kept(tmp_path):
+    path = tmp_path / 'domains.txt'
+    path.write_text(' example.com \n\nexample.org\n', encoding='utf-8')
+    assert list(iter_rows(path)) == [(1, 'example.com'), (2, ''), (3, 'example.org')]
+    assert count_domains(path) == 3
+
+
+def test_gzipped_csv_first_column(tmp_path):
+    path = tmp_path / 'domains.csv.gz'
+    with gzip.open(path, 'wt', encoding='utf-8') as f:
+        f.write('example.com,x\nexample.org,y')
+    assert list(iter_rows(path)) == [(1, 'example.com'), (2, 'example.org')]
+    assert count_domains(path) == 2
+
+
+def test_file_rows_are_numbered_after_the_list(tmp_path):
+    path = tmp_path / 'domains.txt'
+    path.write_text('a.com\nb.com\n', encoding='utf-8')
+    rows = list(iter_input_rows(['x.com', 'y.com'], path))
+    assert rows == [(1, 'x.com'), (2, 'y.com'), (3, 'a.com'), (4, 'b.com')]
+    assert list(iter_input_rows(None, path)) == [(1, 'a.com'), (2, 'b.com')]
+
+
+def test_workbook_rows_are_counted_without_declared_dimensions(tmp_path):
+    workbook = Workbook()
+    for domain in ('a.com', 'b.com', 'c.com'):
+        workbook.active.append([domain])
+    saved = tmp_path / 'saved.xlsx'
+    workbook.save(saved)
+    assert count_domains(saved) == 3
+
+    # Same workbook without its <dimension ref="A1:A3"/>, as some exporters write it
+    path = tmp_path / 'domains.xlsx'
+    with zipfile.ZipFile(saved) as source, zipfile.ZipFile(path, 'w') as target:
+        for info in source.infolist():
+            data = source.read(info)
+            if info.filename == 'xl/worksheets/sheet1.xml':
+                data = re.sub(rb'<dimension [^>]*/>', b'', data)
+            target.writestr(info, data)
+    assert count_domains(path) == 3
+    assert [entry for _, entry in iter_rows(path)] == ['a.com', 'b.com', 'c.com']
@@ -0,0 +1,66 @@
+from phoneScrapper.links import LinkClassifier, LinkFrontier
+
+
+classifier = LinkClassifier({'contact': 3, 'about': 1}, ['facebook.com'])
+
+
+def test_classify_all_scores_every_anchor_in_page_order():
+    anchors = [
+        ('/contact', 'Write to us'),
+        ('/team', 'About the team'),
+        ('https://facebook.com/acme', 'Follow us'),
+        ('/shop', None),
+    ]
+    classified = classifier.classify_all(anchors)
+    assert [(link.link, link.score, link.is_social) for link in classified] == [
+        ('/contact', 3, False),
+        ('/team', 1, False),
+        ('https://facebook.com/acme', 0, True),
+        ('/shop', 0, False),
+    ]
+    assert classified == [classifier.classify(href, text) for href, text in anchors]
+
+
+def test_classify_all_scans_repeated_anchors_once():
+    calls = []
+    counting = LinkClassifier({'contact': 3}, [])
+    counting.classify = lambda link, text=None: calls.append(link) or LinkClassifier.classify(counting, link, text)
+    classified = counting.classify_all([('/contact', 'Contact'), ('/contact', 'Contact'), ('/contact', None)])
+    assert calls == ['/contact', '/contact']
+    assert classified[0] is classified[1]
+
+
+def select(frontier, anchors, parent_url='https://a.com', base_url='https://a.com/'):
+    return frontier.select(parent_url, base_url, classifier.classify_all(anchors))
+
+
+def test_deeper_links_are_penalized_but_still_followed():
+    frontier = LinkFrontier(depth_penalty=1)
+    links, _ = select(frontier, [('/a/b/c/contact', None), ('/contact', None), ('/x/y/z/w/about', None)])
+    assert [(link.url, link.score) for link in links] == [
+        ('https://a.com/contact', 3),
+        ('https://a.com/a/b/c/contact', 1),
+        # Never below 1 for a relevant link
+        ('https://a.com/x/y/z/w/about', 1),
+    ]
+
+
+def test_follows_are_capped_and_deduped_per_parent():
+    frontier = LinkFrontier(max_follows=2)
+    links, social_links = select(frontier, [
+        ('/contact', None), ('/contact/#form', None), ('/about', None), ('/about-us', 'About'),
+        ('https://facebook.com/acme', 'Follow us'), ('mailto:contact@a.com', None), ('/', 'About'),
+    ])
+    assert [link.url for link in links] == ['https://a.com/contact', 'https://a.com/about']
+    assert social_links == 1
+
+    # The cap holds across the parent's pages, not per page
+    links, _ = select(frontier, [('/contact-us', None)], base_url='https://a.com/about')
+    assert links == []
+    # Other parents have their own
+    links, _ = select(frontier, [('/contact', None)], parent_url='https://b.com', base_url='https://b.com/')
+    assert [link.url for link in links] == ['https://b.com/contact']
+
+    frontier.release('https://a.com')
+    links, _ = select(frontier, [('/contact', None)])
+    assert [link.url for link in links] == ['https://a.com/contact']
@@ -0,0 +1,68 @@
+import unittest
+
+from scrapy import Request, signals
+from scrapy.exceptions import IgnoreRequest, StopDownload
+from scrapy.utils.test import get_crawler
+
+from phoneScrapper.middlewares import SatisfiedParentMiddleware
+
+
+class Spider:
+    """Parents listed in satisfied have all their phone numbers."""
+
+    def __init__(self):
+        self.satisfied = set()
+
+    def is_parent_satisfied(self, parent_url):
+        return parent_url in self.satisfied
+
+
+class SatisfiedParentMiddlewareTest(unittest.TestCase):
+
+    def setUp(self):
+        self.crawler = get_crawler()
+        self.middleware = SatisfiedParentMiddleware.from_crawler(self.crawler)
+        self.spider = Spider()
+
+    def schedule(self, url, **meta):
+        request = Request(url, meta={'parent_url': 'https://a.com', **meta})
+        self.crawler.signals.send_catch_log(signal=signals.request_scheduled, request=request, spider=self.spider)
+        return request
+
+    def test_parent_requests_are_never_cancelled(self):
+        self.spider.satisfied.add('https://a.com')
+        request = self.schedule('https://a.com', is_parent=True)
+        self.assertIsNone(self.middleware.process_request(request, self.spider))
+        self.assertEqual(self.middleware.outstanding, {})
+
+    def test_follow_ups_of_a_satisfied_parent_are_dropped(self):
+        first = self.schedule('https://a.com/contact')
+        second = self.schedule('https://a.com/about')
+        self.assertIsNone(self.middleware.process_request(first, self.spider))
+        self.spider.satisfied.add('https://a.com')
+
+        with self.assertRaisesRegex(IgnoreRequest, r'\(1 more requests outstanding\)'):
+            self.middleware.process_request(second, self.spider)
+        self.assertEqual(self.crawler.stats.get_value('satisfied_parent/dropped'), 1)
+
+    def test_downloads_are_aborted_when_their_headers_arrive(self):
+        request = self.schedule('https://a.com/contact')
+        self.spider.satisfied.add('https://a.com')
+
+        with self.assertRaises(StopDownload):
+            self.middleware.headers_received({}, 0, request, self.spider)
+        with self.assertRaises(IgnoreRequest):
+            self.middleware.process_exception(request, StopDownload(fail=True), self.spider)
+        self.assertEqual(self.crawler.stats.get_value('satisfied_parent/aborted'), 1)
+        self.assertEqual(self.middleware.outstanding, {})
+
+    def test_requests_dropped_by_the_scheduler_are_no_longer_outstanding(self):
+        request = self.schedule('https://a.com/contact')
+        self.schedule('https://a.com/about')
+        self.crawler.signals.send_catch_log(signal=signals.request_dropped, request=request, spider=self.spider)
+        self.assertEqual(self.middleware.outstanding, {'https://a.com': 1})
+
+    def test_retries_are_counted_once(self):
+        request = self.schedule('https://a.com/contact')
+        self.crawler.signals.send_catch_log(signal=signals.request_scheduled, request=request, spider=self.spider)
+        self.assertEqual(self.middleware.outstanding, {'https://a.com': 1})
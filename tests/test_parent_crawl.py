@@ -0,0 +1,45 @@
+from scrapy import Request, signals
+from scrapy.http import HtmlResponse
+from scrapy.utils.test import get_crawler
+
+from phoneScrapper.results import DELTA, FINAL
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+
+
+PAGE = b'<html><body><p>Call us: +1 212-555-0199</p></body></html>'
+
+
+def open_spider():
+    crawler = get_crawler(PhoneScrapperSpider, {'DOMAIN_ROW_MAP': None})
+    crawler.spider = crawler._create_spider()
+    crawler.signals.send_catch_log(signal=signals.spider_opened, spider=crawler.spider)
+    return crawler, crawler.spider
+
+
+def test_parse_yields_the_final_record_after_the_deltas():
+    crawler, spider = open_spider()
+    request = Request('https://a.com', meta={'parent_url': 'https://a.com', 'is_parent': True})
+    crawler.signals.send_catch_log(signal=signals.request_scheduled, request=request, spider=spider)
+    response = HtmlResponse('https://a.com', body=PAGE, request=request)
+
+    records = [item['record'] for item in spider.parse(response)]
+
+    # No links to follow: the parent is done with its only page
+    assert records == [DELTA, FINAL]
+    assert spider.parent_url_phone_numbers == {}
+    assert crawler.stats.get_value('results/final') == 1
+
+
+def test_final_records_of_parents_cut_short_reach_the_feeds():
+    crawler, spider = open_spider()
+    sent = []
+    # Stand-in for FeedExporter, whose receivers are connected after the spider's
+    crawler.signals.connect(lambda item, response, spider: sent.append(item), signal=signals.item_scraped, weak=False)
+    crawler.signals.connect(lambda spider: sent.append('feeds closed'), signal=signals.spider_closed, weak=False)
+    spider.parent_url_phone_numbers['https://a.com'] = {('2125550199', 'US'): None}
+
+    crawler.signals.send_catch_log(signal=signals.spider_closed, spider=spider, reason='closespider_pagecount')
+
+    item, closed = sent
+    assert closed == 'feeds closed'
+    assert (item['record'], item['url'], item['phone_number_1']) == (FINAL, 'https://a.com', '2125550199')
@@ -0,0 +1,49 @@
+import re
+
+import pytest
+
+from phoneScrapper.phone_matcher import PhoneMatcher
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+
+
+PATTERNS = PhoneScrapperSpider.prioritized_patterns
+
+
+def test_results_are_in_pattern_priority_order():
+    matcher = PhoneMatcher(PATTERNS)
+    text = 'Fax 8005551234, call (212) 555-0199 or 646.555.0100'
+    assert matcher.scan(text) == [(0, '(212) 555-0199'), (2, '646.555.0100'), (4, '8005551234')]
+
+
+def test_same_priority_is_ordered_by_position():
+    matcher = PhoneMatcher(PATTERNS)
+    assert matcher.findall('212-555-0199 and 646 555 0100') == ['212-555-0199', '646 555 0100']
+
+
+def old_findall_loop(text):
+    # What the spiders did before PhoneMatcher
+    return [number for pattern in PATTERNS for number in re.compile(pattern).findall(text)]
+
+
+@pytest.mark.parametrize('text', [
+    '1 123-456-7890',
+    '+1 2125550199',
+    '+12125550199',
+    '(212) 555-0199 212.555.0199 1-800-555-0100',
+    'ID 21255501991234, tel 1 212 555 0199',
+])
+def test_overlapping_matches_are_kept_like_the_old_loop(text):
+    assert PhoneMatcher(PATTERNS).findall(text) == old_findall_loop(text)
+
+
+def test_each_pattern_matches_on_its_own():
+    matcher = PhoneMatcher(PATTERNS)
+    assert matcher.scan('1 123-456-7890') == [(1, '123-456-7890'), (5, '1 123-456-7890')]
+    assert matcher.scan('+1 2125550199') == [(3, '+1 2125550199'), (4, '2125550199'), (5, '1 2125550199')]
+
+
+def test_chunks_with_too_few_digits_are_skipped():
+    matcher = PhoneMatcher(PATTERNS)
+    assert not matcher.has_candidate('call 555-0199')
+    assert matcher.matches('call 555-0199') == []
+    assert matcher.matches('') == []
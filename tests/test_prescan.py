@@ -0,0 +1,37 @@
+import pytest
+from scrapy.http import HtmlResponse, TextResponse
+
+from phoneScrapper.prescan import has_phone_candidates
+
+
+def html(body, encoding='utf-8'):
+    return HtmlResponse('https://a.com', body=body.encode(encoding), encoding=encoding)
+
+
+@pytest.mark.parametrize('body', [
+    '<p>Call 2125550199</p>',
+    '<p>(212) 555-0199</p>',
+    '<p><span>(877)</span> 959-2505</p>',
+    '<p>212&#45;555&#45;0199</p>',
+])
+def test_candidates_in_the_raw_body(body):
+    assert has_phone_candidates(html(body))
+
+
+@pytest.mark.parametrize('body', [
+    '<p>No numbers here</p>',
+    '<p>Since 1998, 24/7 support</p>',
+])
+def test_pages_without_a_digit_run_are_short_circuited(body):
+    assert not has_phone_candidates(html(body))
+
+
+@pytest.mark.parametrize('encoding', ['utf-16', 'utf-16-le', 'utf-32'])
+def test_wide_encoding_bodies_are_never_short_circuited(encoding):
+    # The bytes of a number in these encodings have zeros between the digits
+    assert has_phone_candidates(html('<p>No numbers here</p>', encoding))
+    assert has_phone_candidates(html('<p>Call 2125550199</p>', encoding))
+
+
+def test_text_responses():
+    assert not has_phone_candidates(TextResponse('https://a.com/robots.txt', body=b'User-agent: *'))
@@ -0,0 +1,132 @@
+import pytest
+from scrapy import Request
+from scrapy.signalmanager import SignalManager
+from scrapy.utils.test import get_crawler
+from twisted.internet.error import DNSLookupError
+from twisted.python.failure import Failure
+
+from phoneScrapper.progress import (
+    FAILED, FINISHED, SKIPPED, STARTED, CompletionRate, DomainEvent, DomainTracker, domain_event, split_batch,
+)
+
+
+class Recorder:
+
+    def __init__(self, numbers=None):
+        self.events = []
+        self.finished = []
+        self.tracker = DomainTracker(lambda parent_url: (numbers or {}).get(parent_url, 0))
+        self.tracker.on_finished = self.finished.append
+        signals = SignalManager()
+        signals.connect(self.receive, signal=domain_event)
+        self.tracker.signals = signals
+
+    def receive(self, event):
+        self.events.append(event)
+
+    def kinds(self):
+        return [(event.kind, event.url) for event in self.events]
+
+
+def request(url, parent_url=None):
+    return Request(url, meta={'parent_url': parent_url or url})
+
+
+def dns_failure():
+    try:
+        raise DNSLookupError()
+    except DNSLookupError:
+        return Failure()
+
+
+def test_domain_finishes_after_its_last_request():
+    recorder = Recorder({'https://a.com': 2})
+    tracker = recorder.tracker
+    parent = request('https://a.com')
+    tracker.request_scheduled(parent, None)
+    child = request('https://a.com/contact', 'https://a.com')
+
+    def callback():
+        # The scheduler counts requests while the callback's output is consumed
+        tracker.request_scheduled(child, None)
+        yield child
+
+    assert list(tracker.track(parent, callback())) == [child]
+    assert recorder.kinds() == [(STARTED, 'https://a.com')]
+    tracker.done(child, dns_failure())
+    assert recorder.kinds() == [(STARTED, 'https://a.com'), (FINISHED, 'https://a.com')]
+    assert recorder.events[-1].numbers == 2
+    assert recorder.finished == ['https://a.com']
+    assert tracker.pending == {}
+
+
+def test_retries_are_counted_once_and_failures_report_the_last_reason():
+    recorder = Recorder()
+    tracker = recorder.tracker
+    first = request('https://b.com')
+    tracker.request_scheduled(first, None)
+    # RetryMiddleware schedules a copy of the request, meta included
+    retry = first.replace(dont_filter=True)
+    tracker.request_scheduled(retry, None)
+    assert tracker.pending == {'https://b.com': 1}
+    tracker.done(retry, dns_failure())
+    assert recorder.events[-1] == DomainEvent(FAILED, 'https://b.com', 0, 'dns')
+    # Done already: a second errback for it changes nothing
+    tracker.done(retry, dns_failure())
+    assert len(recorder.events) == 2
+
+
+def test_dropped_requests_are_done():
+    recorder = Recorder()
+    tracker = recorder.tracker
+    parent = request('https://c.com')
+    tracker.request_scheduled(parent, None)
+    tracker.request_dropped(parent, None)
+    assert recorder.kinds() == [(STARTED, 'https://c.com'), (FAILED, 'https://c.com')]
+    assert recorder.events[-1].reason == 'dropped'
+
+
+def test_requests_without_parent_are_ignored():
+    recorder = Recorder()
+    recorder.tracker.request_scheduled(Request('https://d.com'), None)
+    assert recorder.events == [] and recorder.tracker.pending == {}
+
+
+def test_skipped_rows_and_stats():
+    recorder = Recorder()
+    tracker = recorder.tracker
+    tracker.stats = get_crawler().stats
+    tracker.skipped(3, 'www.a.com', 'duplicate')
+    assert recorder.events == [DomainEvent(SKIPPED, 'www.a.com', 0, 'duplicate')]
+    tracker.request_scheduled(request('https://a.com'), None)
+    tracker.record_stats(tracker.stats)
+    assert tracker.stats.get_value('domains/skipped') == 1
+    assert tracker.stats.get_value('domains/started') == 1
+    assert tracker.stats.get_value('domains/unfinished') == 1
+
+
+def test_split_batch():
+    event = DomainEvent(STARTED, 'https://a.com', 0, None)
+    assert split_batch([{'url': 'x'}, event]) == ([{'url': 'x'}], [event])
+
+
+def test_completion_rate_starts_with_the_average():
+    rate = CompletionRate(half_life=10, min_interval=1)
+    rate.update(0, 0.0)
+    rate.update(0, 5.0)
+    assert rate.rate is None and rate.eta(10) is None
+    rate.update(10, 10.0)
+    assert rate.rate == pytest.approx(1.0)
+    assert rate.eta(30) == pytest.approx(30.0)
+    assert rate.eta(0) == 0.0
+
+
+def test_completion_rate_moves_by_half_over_a_half_life():
+    rate = CompletionRate(half_life=10, min_interval=1)
+    rate.update(0, 0.0)
+    rate.update(10, 10.0)
+    rate.update(40, 20.0)
+    assert rate.rate == pytest.approx(2.0)
+    # Samples closer than min_interval are ignored
+    rate.update(100, 20.5)
+    assert rate.rate == pytest.approx(2.0)
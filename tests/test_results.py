@@ -0,0 +1,56 @@
+from phoneScrapper.results import DELTA, FINAL, FinalRecordFilter, is_final, result_item
+from results_model import ResultsTableModel
+
+
+def values(fields):
+    return [fields.get(key, '') for key in (
+        'url', 'phone_number_1', 'country_1', 'phone_number_2', 'country_2', 'phone_number_3', 'country_3')]
+
+
+def test_result_item_slots():
+    item = result_item('https://a.com', [('1', 'US'), ('2', 'CA')], first_slot=1, record=DELTA)
+    assert dict(item) == {'url': 'https://a.com', 'record': DELTA,
+                          'phone_number_2': '1', 'country_2': 'US', 'phone_number_3': '2', 'country_3': 'CA'}
+    # Numbers past the last slot are left out
+    assert 'phone_number_4' not in result_item('https://a.com', [(str(n), 'US') for n in range(5)])
+
+
+def test_final_record_filter():
+    accepts = FinalRecordFilter({}).accepts
+    assert accepts(result_item('https://a.com', [('1', 'US')]))
+    assert not accepts(result_item('https://a.com', [('1', 'US')], record=DELTA))
+    # Items without a record field are complete results
+    assert accepts({'url': 'https://a.com'})
+    assert is_final({'url': 'https://a.com', 'record': FINAL})
+
+
+def test_deltas_merge_until_the_final_record_replaces_them():
+    model = ResultsTableModel()
+    model.apply_records([
+        result_item('https://a.com', [('1', 'US')], record=DELTA),
+        result_item('https://b.com', [('3', 'CA')], record=DELTA),
+        result_item('https://a.com', [('2', 'US')], first_slot=1, record=DELTA),
+    ], values)
+    assert model.store.row(0) == ['https://a.com', '1', 'US', '2', 'US', '', '']
+    assert model.partial['https://a.com']['phone_number_2'] == '2'
+
+    model.apply_records([result_item('https://a.com', [('1', 'US')])], values)
+    assert model.store.row(0) == ['https://a.com', '1', 'US', '', '', '', '']
+    assert 'https://a.com' not in model.partial
+    assert len(model.store) == 2
+
+
+def test_views_see_rows_and_updates_on_publish():
+    model = ResultsTableModel()
+    inserted = []
+    changed = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.dataChanged.connect(lambda top_left, bottom_right: changed.append((top_left.row(), bottom_right.row())))
+    model.apply_records([result_item('https://a.com', [('1', 'US')], record=DELTA)], values)
+    assert model.rowCount() == 0
+    assert model.publish()
+    assert model.rowCount() == 1 and inserted == [(0, 0)]
+    model.apply_records([result_item('https://a.com', [('1', 'US'), ('2', 'US')])], values)
+    assert not model.publish()
+    assert changed == [(0, 0)]
+    assert model.data(model.index(0, 4)) == '2'
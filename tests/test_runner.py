@@ -0,0 +1,60 @@
+import csv
+from datetime import datetime, timedelta
+
+from phoneScrapper.domains import ROW_MAP_FIELDS
+from phoneScrapper.runner import _shard_feeds, merge_row_maps, merge_stats, shard_path
+
+
+START = datetime(2026, 1, 1, 12, 0, 0)
+
+
+def test_merge_stats_across_shards():
+    merged = merge_stats([
+        {'start_time': START, 'finish_time': START + timedelta(seconds=30), 'finish_reason': 'finished',
+         'item_scraped_count': 10, 'memusage/max': 100, 'log_count/ERROR': 1},
+        {'start_time': START - timedelta(seconds=5), 'finish_time': START + timedelta(seconds=20),
+         'finish_reason': 'shutdown', 'item_scraped_count': 5, 'memusage/max': 300, 'shard_only': 2},
+        {'start_time': START, 'finish_time': START + timedelta(seconds=10), 'finish_reason': 'closespider_timeout',
+         'item_scraped_count': 1, 'memusage/max': 200},
+    ])
+    assert merged['item_scraped_count'] == 16
+    assert merged['memusage/max'] == 300
+    assert merged['shard_only'] == 2 and merged['log_count/ERROR'] == 1
+    # First reason other than 'finished'
+    assert merged['finish_reason'] == 'shutdown'
+    assert merged['elapsed_time_seconds'] == 35
+
+
+def write_rows(path, rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(ROW_MAP_FIELDS)
+        writer.writerows(rows)
+
+
+def test_merge_row_maps_orders_rows_across_shards(tmp_path):
+    row_map = str(tmp_path / 'rows.csv')
+    write_rows(shard_path(row_map, 0), [
+        ['1', 'a.com', 'a.com', 'https://a.com', 'ok'],
+        ['3', 'A.com', 'a.com', 'https://a.com', 'duplicate'],
+        ['10', 'c.com', 'c.com', 'https://c.com', 'ok'],
+    ])
+    write_rows(shard_path(row_map, 1), [
+        ['2', 'b.com', 'b.com', 'https://b.com', 'ok'],
+        ['4', '', '', '', 'rejected:empty'],
+    ])
+
+    # Shard 2 had no domains and wrote nothing
+    merge_row_maps([shard_path(row_map, index) for index in range(3)], row_map)
+
+    with open(row_map, newline='', encoding='utf-8') as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == list(ROW_MAP_FIELDS)
+    assert [row[0] for row in rows[1:]] == ['1', '2', '3', '4', '10']
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['rows.csv']
+
+
+def test_file_feeds_get_one_copy_per_shard():
+    feeds = {'results.csv': {'format': 'csv'}, 's3://bucket/results.csv': {'format': 'csv'}, 'stdout:': {}}
+    assert _shard_feeds(feeds, 1) == {
+        'results.shard1.csv': {'format': 'csv'}, 's3://bucket/results.csv': {'format': 'csv'}, 'stdout:': {}}
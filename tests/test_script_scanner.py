@@ -0,0 +1,44 @@
+import lxml.html
+import pytest
+
+from phoneScrapper.phone_matcher import PhoneMatcher
+from phoneScrapper.script_scanner import ScriptScanner
+from phoneScrapper.spiders.phone_scrapper import PhoneScrapperSpider
+
+
+def page(*scripts):
+    return lxml.html.fromstring('<html><head>%s</head><body></body></html>' % ''.join(scripts))
+
+
+@pytest.fixture
+def scanner():
+    return ScriptScanner(PhoneMatcher(PhoneScrapperSpider.prioritized_patterns), window_size=16)
+
+
+@pytest.mark.parametrize('offset', range(0, 20))
+def test_number_across_a_window_boundary_is_found_once(scanner, offset):
+    script = '<script>var x = "%s212-555-0199";</script>' % ('.' * offset)
+    assert list(scanner.scan(page(script))) == ['212-555-0199']
+
+
+@pytest.mark.parametrize('script, priority', [
+    ('<script type="application/ld+json">{"telephone": "1"}</script>', True),
+    ('<script>window.__INITIAL_STATE__ = JSON.parse("{}")</script>', True),
+    ('<script>var config = {"phone": "1"};</script>', True),
+    ('<script>\n  site.settings={"phone": "1"}</script>', True),
+    ('<script>document.addEventListener("load", init);</script>', False),
+    ('<script>ga("send", "pageview");</script>', False),
+])
+def test_priority_scripts(scanner, script, priority):
+    element = next(page(script).iter('script'))
+    assert scanner.is_priority(element, element.text) is priority
+
+
+def test_config_scripts_are_scanned_first_then_smaller_first(scanner):
+    root = page(
+        '<script>track("212-555-0101");</script>',
+        '<script>var config = {"phone": "212-555-0102", "x": 1};</script>',
+        '<script>init(); track("212-555-0103", "page");</script>',
+        '<script type="application/ld+json">{"telephone": "212-555-0104"}</script>',
+    )
+    assert list(scanner.scan(root)) == ['212-555-0104', '212-555-0102', '212-555-0101', '212-555-0103']
@@ -0,0 +1,28 @@
+from phoneScrapper.seen_numbers import SeenNumbers
+
+
+def test_membership_ignores_formatting():
+    seen = SeenNumbers(['(212) 555-0199'])
+    assert '212.555.0199' in seen
+    assert '2125550198' not in seen
+    assert len(seen) == 1
+
+
+def test_overlaps_substring_and_superstring():
+    seen = SeenNumbers(['212-555-0199'])
+    assert seen.overlaps('2125550199')
+    assert seen.overlaps('555-0199')
+    assert seen.overlaps('+1 212 555 0199')
+    assert not seen.overlaps('646-555-0100')
+    assert not seen.overlaps('')
+
+
+def test_superstring_of_the_shortest_number_only():
+    seen = SeenNumbers(['5550199', '2125550100'])
+    assert seen.overlaps('12125550199')
+    assert seen.overlaps('+1 212 555 0100 ext')
+    assert not seen.overlaps('6465550198')
+
+
+def test_empty_set_overlaps_nothing():
+    assert not SeenNumbers().overlaps('2125550199')
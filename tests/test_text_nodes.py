@@ -0,0 +1,39 @@
+from lxml import html
+
+from phoneScrapper.text_nodes import PageText
+
+
+def page_text(markup):
+    return PageText(html.fromstring(markup))
+
+
+def texts(page):
+    return {block.context.tag: block.text for block in page.blocks}
+
+
+def test_nested_block_text_is_not_repeated_in_the_enclosing_block():
+    page = page_text('<div>Call <section>(877) 959-2505</section> today</div>')
+    assert texts(page) == {'div': 'Call  today', 'section': '(877) 959-2505'}
+
+
+def test_inline_markup_is_merged_into_its_block():
+    page = page_text('<p><span>(877)</span> <b>959</b>-2505</p>')
+    assert texts(page) == {'p': '(877) 959-2505'}
+
+
+def test_every_text_node_is_visited_once():
+    page = page_text('<div><div><div>800 555 1234</div></div></div>')
+    assert [chunk.text for chunk in page.chunks] == ['800 555 1234']
+    assert [block.text for block in page.blocks] == ['800 555 1234']
+
+
+def test_invisible_content_is_skipped():
+    page = page_text('<div>a<script>var n = "8005551234";</script><!-- x -->b<style>p{}</style></div>')
+    assert [block.text for block in page.blocks] == ['ab']
+
+
+def test_spans_and_tel_links_keep_nested_text():
+    page = page_text('<p><a href="tel:+18005551234"><span>800</span> 555 1234</a> <span>x<i>y</i></span></p>')
+    assert page.tel_hrefs == ['tel:+18005551234']
+    assert [link.text for link in page.tel_links] == ['800 555 1234']
+    assert [(span.text, span.own_text) for span in page.spans] == [('800', '800'), ('xy', 'x')]
@@ -0,0 +1,65 @@
+import queue
+import threading
+
+from phoneScrapper.transport import END, BatchSender, receive_batches
+
+
+class Sent:
+    """send() target that lets a test wait for the flush thread."""
+
+    def __init__(self):
+        self.batches = []
+        self.arrived = threading.Event()
+
+    def __call__(self, batch):
+        self.batches.append(batch)
+        self.arrived.set()
+
+
+def test_flush_by_size():
+    sent = Sent()
+    # Long interval: only full batches go out before close()
+    sender = BatchSender(sent, batch_size=3, interval=60)
+    for item in range(7):
+        sender.add(item)
+    assert sent.batches == [[0, 1, 2], [3, 4, 5]]
+    sender.close()
+    assert sent.batches == [[0, 1, 2], [3, 4, 5], [6]]
+    assert sender.batches == 3
+
+
+def test_flush_by_timer():
+    sent = Sent()
+    sender = BatchSender(sent, batch_size=100, interval=0.01)
+    try:
+        sender.add('a')
+        sender.add('b')
+        assert sent.arrived.wait(5)
+        assert sent.batches == [['a', 'b']]
+    finally:
+        sender.close()
+
+
+def test_close_sends_what_is_left_once():
+    sent = Sent()
+    sender = BatchSender(sent, batch_size=100, interval=60)
+    sender.add('a')
+    sender.close()
+    sender.close()
+    assert not sender.thread.is_alive()
+    assert sent.batches == [['a']]
+    # Nothing left: no empty batch
+    empty = Sent()
+    BatchSender(empty, interval=60).close()
+    assert empty.batches == []
+
+
+def test_receive_batches_until_end_or_dead_sender():
+    q = queue.Queue()
+    for batch in (['a'], ['b', 'c'], END, ['after end']):
+        q.put(batch)
+    assert list(receive_batches(q, alive=lambda: True, timeout=0.01)) == [['a'], ['b', 'c']]
+
+    q = queue.Queue()
+    q.put(['a'])
+    assert list(receive_batches(q, alive=lambda: False, timeout=0.01)) == [['a']]
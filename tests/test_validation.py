@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from phoneScrapper.validation import PhoneValidator
+
+
+ALL_RULES = ['length', 'repeated_digits', 'suspicious_sequence', 'id_format', 'id_pattern',
+             'reserved_prefix', 'timestamp', 'letters']
+
+
+@pytest.mark.parametrize('number, reason', [
+    ('', 'empty'),
+    ('555-0199', 'length'),
+    ('+1 212 555 0199 0199', 'length'),
+    ('2222222555', 'repeated_digits'),
+    ('212-168-0199', 'suspicious_sequence'),
+    ('21-2555-0199', 'id_format'),
+    ('shopify-2125550199', 'id_pattern'),
+    ('1790555019', 'reserved_prefix'),
+    ('1600000000', 'timestamp'),
+    ('212 555 0199 ext', 'letters'),
+])
+def test_rejections(number, reason):
+    validator = PhoneValidator(ALL_RULES, max_digits=12)
+    assert validator.reject_reason(number) == reason
+
+
+def test_timestamp_rule_only_applies_to_digit_only_candidates():
+    validator = PhoneValidator(['timestamp'])
+    assert validator.reject_reason('1600000000') == 'timestamp'
+    # Same digits, but formatted: not a timestamp
+    assert validator.reject_reason('160-000-0000') is None
+    # Before 1980 or in the future
+    assert validator.reject_reason('0300000000') is None
+    assert validator.reject_reason(str(int(time.time()) + 3600)) is None
+
+
+def test_timestamp_rule_follows_the_clock(monkeypatch):
+    validator = PhoneValidator(['timestamp'])
+    later = int(time.time()) + 3600
+    assert validator.reject_reason(str(later)) is None
+    monkeypatch.setattr(time, 'time', lambda: later + 1)
+    assert validator.reject_reason(str(later)) == 'timestamp'
+
+
+def test_first_failing_rule_is_counted():
+    validator = PhoneValidator(['length', 'repeated_digits'])
+    candidates = ['2125550199', '555', '9999999999', '(212) 555-0199']
+    assert [number for number in candidates if validator.is_valid(number)] == ['2125550199', '(212) 555-0199']
+    assert validator.accepted == 2
+    assert validator.rejections == {'length': 1, 'repeated_digits': 1}
+
+
+def test_rules_not_enabled_are_not_applied():
+    assert PhoneValidator(['length']).is_valid('212-168-0199')
@@ -0,0 +1,68 @@
+import logging
+import mmap
+import os
+
+import pytest
+
+from phoneScrapper.zip_index import ZipIndex, build_index, normalize_zip
+
+
+CSV = '''Zip,Country
+2134,United States
+10001,United States
+10001-1234,United States
+M5V 3L9,Canada
+K1A,Canada
+,Nowhere
+'''
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / 'Country_zip.csv'
+    path.write_text(CSV, encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.parametrize('zip_code, expected', [
+    ('2134', ('US', '02134')),
+    ('02134.0', ('US', '02134')),
+    ('10001-1234', ('US', '10001')),
+    ('m5v 3l9', ('CA', 'M5V3L9')),
+    ('K1A', ('CA', 'K1A')),
+    ('ABCDE', None),
+])
+def test_normalize_zip(zip_code, expected):
+    assert normalize_zip(zip_code) == expected
+
+
+def test_index_is_built_next_to_the_csv_and_mapped(csv_path):
+    index = ZipIndex(csv_path)
+    assert index.get('02134') == 'United States'
+    assert isinstance(index._data, mmap.mmap)
+    assert os.path.exists(csv_path[:-4] + '.zipidx')
+
+    assert index['M5V 3L9'] == 'Canada'
+    # Unknown full postal code: falls back to its forward sortation area
+    assert index.get('K1A 0B1') == 'Canada'
+
+
+def test_build_index_counts(csv_path, tmp_path):
+    assert build_index(csv_path, str(tmp_path / 'other.zipidx')) == (2, 2, 2)
+    assert ZipIndex(str(tmp_path / 'other.zipidx')).get('10001') == 'United States'
+
+
+def test_missing_zip_codes(csv_path):
+    index = ZipIndex(csv_path)
+    assert index.get('99999') is None
+    assert index.get('99999', 'US') == 'US'
+    assert 'H0H 0H0' not in index
+    with pytest.raises(KeyError):
+        index['99999']
+
+
+def test_missing_index_file_logs_and_finds_nothing(tmp_path, caplog):
+    index = ZipIndex(str(tmp_path / 'missing.zipidx'))
+    with caplog.at_level(logging.ERROR, logger='phoneScrapper.zip_index'):
+        assert index.get('10001') is None
+    assert 'Could not load ZIP index' in caplog.text
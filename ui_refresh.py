@@ -0,0 +1,90 @@
+# Refreshing the GUIs (app.py, app3.py) at a fixed frame rate.
+#
+# Every batch of items used to rewrite the four count labels, set the
+# progress bar, call QApplication.processEvents() and insert its rows into
+# the table. At high item rates the repainting cost more than the items.
+# Now items_scraped only adds to the counters and to the table's store and
+# marks what it changed; the window's QTimer calls refresh() FRAME_RATE
+# times a second, which redraws only the parts marked since the last frame.
+#
+# RefreshScheduler keeps the dirty flags and times the frames. The paint
+# events a frame causes run after it in the event loop, so a GUI that can't
+# keep up shows as intervals between frames well above the timer's.
+
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+# Frames per second
+FRAME_RATE = 8
+
+
+class FrameStats:
+    """How long the last frames took and how far apart they started, in seconds."""
+
+    def __init__(self, size=1000):
+        self.frames = 0
+        self.durations = deque(maxlen=size)
+        self.intervals = deque(maxlen=size)
+        self.last_start = None
+
+    def record(self, start, end):
+        self.frames += 1
+        self.durations.append(end - start)
+        if self.last_start is not None:
+            self.intervals.append(start - self.last_start)
+        self.last_start = start
+
+    def summary(self, interval):
+        """Frame times and intervals in ms; late counts intervals over twice interval."""
+        durations = sorted(self.durations)
+        intervals = self.intervals
+        return {
+            'frames': self.frames,
+            'frame_ms_mean': 1000 * sum(durations) / len(durations) if durations else 0.0,
+            'frame_ms_p95': 1000 * durations[int(0.95 * (len(durations) - 1))] if durations else 0.0,
+            'frame_ms_max': 1000 * durations[-1] if durations else 0.0,
+            'interval_ms_mean': 1000 * sum(intervals) / len(intervals) if intervals else 0.0,
+            'interval_ms_max': 1000 * max(intervals) if intervals else 0.0,
+            'late': sum(1 for i in intervals if i > 2 * interval),
+        }
+
+
+class RefreshScheduler:
+    """
+    Dirty flags of the parts of a window ('counts', 'table', ...) and the
+    frame-time stats of its refresh. interval is the timer's, in ms.
+    """
+
+    def __init__(self, rate=FRAME_RATE):
+        self.interval = 1000 // rate
+        self.dirty = set()
+        self.stats = FrameStats()
+
+    def mark(self, *parts):
+        self.dirty.update(parts)
+
+    @contextmanager
+    def frame(self):
+        """Time one frame, yielding the parts marked dirty since the last one."""
+        dirty, self.dirty = self.dirty, set()
+        start = time.perf_counter()
+        try:
+            yield dirty
+        finally:
+            self.stats.record(start, time.perf_counter())
+
+    def summary(self):
+        return self.stats.summary(self.interval / 1000)
+
+    def reset(self):
+        self.dirty = set()
+        self.stats = FrameStats()
+
+    def format_summary(self):
+        summary = self.summary()
+        return (f"{summary['frames']} frames, frame time {summary['frame_ms_mean']:.1f} ms mean, "
+                f"{summary['frame_ms_p95']:.1f} ms p95, {summary['frame_ms_max']:.1f} ms max, "
+                f"interval {summary['interval_ms_mean']:.0f} ms mean, {summary['interval_ms_max']:.0f} ms max, "
+                f"{summary['late']} late")